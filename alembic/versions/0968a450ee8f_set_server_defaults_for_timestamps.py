@@ -0,0 +1,50 @@
+"""Set server defaults for created_at/updated_at
+
+Revision ID: 0968a450ee8f
+Revises: a5df4b5f9cf9
+Create Date: 2026-10-16 12:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0968a450ee8f'
+down_revision: Union[str, Sequence[str], None] = 'a5df4b5f9cf9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 需要数据库端默认时间的表和列
+TIMESTAMP_COLUMNS = (
+    ('textbook_chunks', 'created_at'),
+    ('textbook_chunks', 'updated_at'),
+    ('mistake_records', 'created_at'),
+    ('mistake_records', 'updated_at'),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # 模型不再在Python端填写时间，改由列默认值 timezone('utc', now()) 生成；
+    # create_all不会给已有表补默认值，否则新插入的行时间为NULL
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table, column,
+            server_default=sa.text("timezone('utc', now())"),
+            existing_type=sa.DateTime(),
+            existing_nullable=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(
+            table, column,
+            server_default=None,
+            existing_type=sa.DateTime(),
+            existing_nullable=True,
+        )
@@ -0,0 +1,65 @@
+"""Convert metadata columns to JSONB and add GIN index
+
+Revision ID: a5df4b5f9cf9
+Revises: cc09f62012cb
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a5df4b5f9cf9'
+down_revision: Union[str, Sequence[str], None] = 'cc09f62012cb'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # create_all不会修改已有表，旧库中的json列需要显式转换为jsonb，
+    # 否则 metadata_json @> CAST(... AS jsonb) 过滤会报 operator does not exist
+    op.alter_column(
+        'textbook_chunks', 'metadata_json',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        existing_nullable=False,
+        postgresql_using='metadata_json::jsonb',
+    )
+    op.alter_column(
+        'mistake_records', 'knowledge_points',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        existing_nullable=True,
+        postgresql_using='knowledge_points::jsonb',
+    )
+
+    # 元数据过滤（metadata_json @> ...）使用GIN索引，与init_database创建的索引同名
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS textbook_chunks_metadata_gin ON textbook_chunks "
+        "USING GIN (metadata_json jsonb_path_ops)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP INDEX IF EXISTS textbook_chunks_metadata_gin")
+
+    op.alter_column(
+        'mistake_records', 'knowledge_points',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        existing_nullable=True,
+        postgresql_using='knowledge_points::json',
+    )
+    op.alter_column(
+        'textbook_chunks', 'metadata_json',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        existing_nullable=False,
+        postgresql_using='metadata_json::json',
+    )
@@ -3,30 +3,17 @@ Homework Pal FastAPI Backend (Simplified Version)
 提供基础的后端服务，暂时忽略数据库连接
 """
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import uvicorn
 import os
 from dotenv import load_dotenv
 
+from homeworkpal.api.app_factory import create_app
+
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(
-    title="Homework Pal API",
-    description="AI-powered homework assistant backend",
-    version="1.0.0"
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+app = create_app()
 
 class HealthResponse(BaseModel):
     status: str
@@ -0,0 +1,38 @@
+"""
+FastAPI应用工厂
+Shared FastAPI application factory
+"""
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+
+def create_app(title: str = "Homework Pal API", version: str = "1.0.0", debug: bool = False) -> FastAPI:
+    """
+    创建配置好CORS的FastAPI应用
+
+    Args:
+        title: 应用标题
+        version: 应用版本
+        debug: 是否开启调试模式
+
+    Returns:
+        FastAPI应用实例
+    """
+    app = FastAPI(
+        title=title,
+        description="AI-powered homework assistant backend",
+        version=version,
+        debug=debug
+    )
+
+    # Configure CORS
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    return app
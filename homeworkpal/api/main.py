@@ -3,8 +3,7 @@ Homework Pal FastAPI Backend
 Provides API endpoints for the frontend application
 """
 
-from fastapi import FastAPI, HTTPException, Depends
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import HTTPException, Depends
 from pydantic import BaseModel
 import uvicorn
 import os
@@ -13,26 +12,14 @@ from dotenv import load_dotenv
 from sqlalchemy import text
 
 # 导入数据库连接
-from homeworkpal.database.connection import init_database, test_connection, get_db
+from homeworkpal.database.connection import engine, init_database, get_db
 from homeworkpal.database.models import TextbookChunk, MistakeRecord
+from homeworkpal.api.app_factory import create_app
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(
-    title="Homework Pal API",
-    description="AI-powered homework assistant backend",
-    version="1.0.0"
-)
-
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+app = create_app()
 
 class HealthResponse(BaseModel):
     status: str
@@ -44,6 +31,15 @@ class DatabaseStatus(BaseModel):
     pgvector_enabled: bool
 
 
+# 数据库健康检查：一次往返同时统计业务表数量和pgvector扩展
+DATABASE_PROBE_QUERY = text("""
+    SELECT
+        (SELECT COUNT(*) FROM information_schema.tables
+         WHERE table_name IN ('textbook_knowledge', 'homework_sessions', 'mistake_records')) AS table_count,
+        (SELECT COUNT(*) FROM pg_extension WHERE extname = 'vector') AS pgvector_count
+""")
+
+
 @app.on_event("startup")
 async def startup_event():
     """应用启动时初始化数据库"""
@@ -71,40 +67,24 @@ async def health_check() -> HealthResponse:
     )
 
 
+def _probe_database() -> DatabaseStatus:
+    """用一次查询检查连接、表和pgvector扩展（同步阻塞调用）"""
+    with engine.connect() as conn:
+        table_count, pgvector_count = conn.execute(DATABASE_PROBE_QUERY).fetchone()
+
+    return DatabaseStatus(
+        connected=True,
+        tables_created=table_count >= 3,
+        pgvector_enabled=pgvector_count > 0
+    )
+
+
 @app.get("/health/database")
 async def database_health():
     """数据库健康检查"""
     try:
-        # 测试基本连接
-        connected = test_connection()
-
-        # 测试表是否存在
-        tables_ok = False
-        pgvector_ok = False
-
-        if connected:
-            from homeworkpal.database.connection import engine
-            with engine.connect() as conn:
-                # 检查表是否存在
-                result = conn.execute(text("""
-                    SELECT COUNT(*) FROM information_schema.tables
-                    WHERE table_name IN ('textbook_knowledge', 'homework_sessions', 'mistake_records')
-                """))
-                table_count = result.fetchone()[0]
-                tables_ok = table_count >= 3
-
-                # 检查pgvector扩展
-                result = conn.execute(text("""
-                    SELECT COUNT(*) FROM pg_extension WHERE extname = 'vector'
-                """))
-                pgvector_count = result.fetchone()[0]
-                pgvector_ok = pgvector_count > 0
-
-        return DatabaseStatus(
-            connected=connected,
-            tables_created=tables_ok,
-            pgvector_enabled=pgvector_ok
-        )
+        # 数据库探测是阻塞IO，放到线程池执行以免阻塞事件循环
+        return await asyncio.to_thread(_probe_database)
 
     except Exception as e:
         return DatabaseStatus(
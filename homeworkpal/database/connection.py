@@ -4,7 +4,10 @@ Database connection management
 """
 
 import os
-from sqlalchemy import create_engine, text
+from typing import List, Dict, Any
+import psycopg
+from pgvector.psycopg import register_vector
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from dotenv import load_dotenv
@@ -25,12 +28,46 @@ engine = create_engine(
     pool_size=10,
     max_overflow=20,
     pool_pre_ping=True,
+    query_cache_size=1200,
     echo=os.getenv("DEBUG", "false").lower() == "true"
 )
 
+
+@event.listens_for(engine, "connect")
+def _register_vector_type(dbapi_connection, connection_record):
+    """为每个新建连接注册pgvector类型，向量以二进制格式收发"""
+    if engine.dialect.driver != "psycopg":
+        return
+
+    try:
+        register_vector(dbapi_connection)
+    except psycopg.ProgrammingError:
+        # vector扩展尚未创建（如首次init_database之前），回退为文本格式
+        dbapi_connection.rollback()
+
+
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 批量导入教材片段的列及其PostgreSQL类型（COPY二进制格式需要显式类型）
+CHUNK_COPY_COLUMNS = (
+    "content", "embedding", "content_hash", "metadata_json",
+    "source_file", "chunk_index", "page_number", "quality_score"
+)
+CHUNK_COPY_TYPES = ("text", "vector", "varchar", "jsonb", "varchar", "int4", "int4", "float8")
+
+# init_database时创建的索引
+INDEX_STATEMENTS = (
+    # 向量相似度检索使用余弦距离(<=>)，HNSW索引避免全表扫描
+    "CREATE INDEX IF NOT EXISTS textbook_chunks_embedding_hnsw ON textbook_chunks "
+    "USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);",
+    # 元数据过滤（metadata_json @> ...）使用GIN索引
+    "CREATE INDEX IF NOT EXISTS textbook_chunks_metadata_gin ON textbook_chunks "
+    "USING GIN (metadata_json jsonb_path_ops);",
+    # 错题记录按关联教材片段查询
+    "CREATE INDEX IF NOT EXISTS mistake_records_textbook_chunk_id_idx ON mistake_records (textbook_chunk_id);",
+)
+
 
 def get_db():
     """获取数据库会话"""
@@ -45,12 +82,22 @@ def init_database():
     """初始化数据库"""
     from .models import Base
 
+    # 确保pgvector扩展已启用（建表前需要vector类型）
+    with engine.connect() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
+        conn.commit()
+
+    # 扩展创建前建立的连接没能注册vector类型（见_register_vector_type），
+    # 丢弃连接池中的这些连接，之后的新连接都会注册，bulk_insert_chunks的COPY才能使用vector类型
+    engine.dispose()
+
     # 创建所有表
     Base.metadata.create_all(bind=engine)
 
-    # 确保pgvector扩展已启用
+    # 创建检索和关联查询使用的索引
     with engine.connect() as conn:
-        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
+        for statement in INDEX_STATEMENTS:
+            conn.execute(text(statement))
         conn.commit()
 
 
@@ -62,4 +109,52 @@ def test_connection():
             return result.fetchone()[0] == 1
     except Exception as e:
         print(f"Database connection test failed: {e}")
-        return False
\ No newline at end of file
+        return False
+
+
+def bulk_insert_chunks(rows: List[Dict[str, Any]]) -> int:
+    """
+    批量写入教材片段
+
+    先用 COPY 二进制流写入临时表，再按 content_hash 去重插入 textbook_chunks，
+    整批数据只需一次数据流和一次插入语句，向量以二进制格式传输。
+
+    Args:
+        rows: 片段字典列表，键为 CHUNK_COPY_COLUMNS 中的列名
+
+    Returns:
+        实际插入的片段数（重复的 content_hash 会被跳过）
+    """
+    if not rows:
+        return 0
+
+    columns = ", ".join(CHUNK_COPY_COLUMNS)
+    raw_conn = engine.raw_connection()
+    try:
+        conn = raw_conn.driver_connection
+
+        with conn.cursor() as cur:
+            cur.execute(
+                f"CREATE TEMP TABLE textbook_chunks_staging ON COMMIT DROP AS "
+                f"SELECT {columns} FROM textbook_chunks WITH NO DATA"
+            )
+
+            with cur.copy(f"COPY textbook_chunks_staging ({columns}) FROM STDIN WITH (FORMAT BINARY)") as copy:
+                copy.set_types(CHUNK_COPY_TYPES)
+                for row in rows:
+                    copy.write_row([row.get(col) for col in CHUNK_COPY_COLUMNS])
+
+            cur.execute(
+                f"INSERT INTO textbook_chunks ({columns}, created_at, updated_at) "
+                f"SELECT {columns}, timezone('utc', now()), timezone('utc', now()) FROM textbook_chunks_staging "
+                f"ON CONFLICT (content_hash) DO NOTHING"
+            )
+            inserted = cur.rowcount
+
+        conn.commit()
+        return inserted
+    except Exception:
+        raw_conn.rollback()
+        raise
+    finally:
+        raw_conn.close()
@@ -7,8 +7,13 @@ Chinese Text Processor for Homework Pal
 
 import re
 import hashlib
+import functools
 import logging
-from typing import List, Dict, Any, Tuple
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
 from homeworkpal.llm.siliconflow import SiliconFlowEmbeddingModel
 import time
 
@@ -18,6 +23,59 @@ logger = logging.getLogger(__name__)
 class ChineseTextProcessor:
     """中文文本专用处理器"""
 
+    # 向量化预处理使用的正则（类加载时编译一次）
+    _RE_WS = re.compile(r'\s+')
+    _RE_NL = re.compile(r'\n+')
+    _RE_KEEP = re.compile(r'[^\u4e00-\u9fff\u3000-\u303f\uff00-\uffef\s，。！？；：""''（）【】《》0-9一二三四五六七八九十]')
+    _RE_PAGE = re.compile(r'\b\d+\s*页\b')
+    _RE_COURSE = re.compile(r'\b第\s*\d+\s*课\b')
+    _RE_UNIT = re.compile(r'\b第\s*\d+\s*单元\b')
+    _RE_DUP_END = re.compile(r'([。！？]){2,}')
+    _RE_DUP_COMMA = re.compile(r'([，]){2,}')
+
+    # 拼音修复的前置检查：是否含有ASCII字母
+    _RE_ASCII_LETTER = re.compile(r'[A-Za-z]')
+
+    # 质量评估：以编号开头的行（如 "1、" "2."）
+    _RE_NUMBERED_LINE = re.compile(r'^\d+[\[、.]', re.MULTILINE)
+
+    # 常见的编码错误（UTF-8 被按 Latin-1/CP1252 解码后的乱码）
+    ENCODING_FIXES = {
+        'ï¼š': '：',
+        'ï¼Œ': '，',
+        'ï¼›': '？',
+        'ï¼': '。',
+        'â€': '"',
+        'â€¦': '…',
+    }
+    # 长的优先，保证 'ï¼š' 不会先被 'ï¼' 截断
+    _RE_ENCODING_FIX = re.compile(
+        '|'.join(map(re.escape, sorted(ENCODING_FIXES, key=len, reverse=True)))
+    )
+
+    # 英文标点 -> 中文标点
+    _PUNCT_TABLE = str.maketrans({',': '，', '.': '。', '!': '！', '?': '？', ':': '：', ';': '；'})
+
+    # 向量维度（BGE-M3）
+    EMBEDDING_DIMENSION = 1024
+
+    # 并发向量化请求数，以及相邻两次请求之间的最小间隔（秒），避免触发API限流
+    MAX_WORKERS = 4
+    MIN_REQUEST_INTERVAL = 0.5
+    # 重试退避：基准与上限（秒），实际等待带 ±50% 随机抖动
+    RETRY_BASE_DELAY = 1.0
+    RETRY_MAX_DELAY = 30.0
+
+    # 预处理/哈希结果缓存条数（同一片段常在多页、多轮处理中重复出现）
+    CACHE_SIZE = 4096
+
+    # 教育内容关键词
+    EDUCATION_KEYWORDS = (
+        '课文', '生字', '词语', '练习', '阅读', '写作', '口语', '交际',
+        '拼音', '识字', '写字', '古诗', '学习', '理解', '背诵',
+        '例句', '造句', '近义词', '反义词', '意思', '解释'
+    )
+
     def __init__(self, embedding_model: SiliconFlowEmbeddingModel):
         """
         初始化中文文本处理器
@@ -28,28 +86,29 @@ class ChineseTextProcessor:
         self.embedding_model = embedding_model
 
         # 常见的拼音到汉字映射表（基于小学语文教材）
+        # 每个拼音只保留一个汉字；同音冲突按原先生效的映射保留：
+        # yǔ→雨(与)、xiào→笑(校)、zuò→做(坐)、huà→画(话)、dào→到(道)、yú→鱼(于)、dì→地(弟)
         self.pinyin_to_hanzi = {
             # 常见单字拼音（基于小学语文三上教材）
-            'huK': '呼', 'chSng': '唱', 'jK': '就', 'shuō': '说', 'de': '的', 'le': '了',
-            'ma': '吗', 'ne': '呢', 'ba': '吧', 'hěn': '很', 'hǎo': '好', 'shì': '是',
+            'huK': '呼', 'chSng': '唱', 'jK': '就', 'de': '的', 'le': '了',
+            'ma': '吗', 'ne': '呢', 'ba': '吧', 'hěn': '很', 'shì': '是',
             'yǒu': '有', 'wǒ': '我', 'nǐ': '你', 'tā': '他', 'zhè': '这', 'nà': '那',
             'zheng': '正', 'zài': '在', 'dōu': '都', 'yě': '也', 'bù': '不', 'kě': '可',
-            'yǐ': '以', 'hé': '和', 'gěn': '跟', 'yǔ': '与', 'yī': '一', 'èr': '二',
+            'yǐ': '以', 'hé': '和', 'gěn': '跟', 'yī': '一', 'èr': '二',
             'sān': '三', 'sì': '四', 'wǔ': '五', 'liù': '六', 'qī': '七', 'bā': '八',
-            'jiǔ': '九', 'shí': '十', 'nián': '年', 'yuè': '月', 'rì': '日', 'tiān': '天',
+            'jiǔ': '九', 'shí': '十', 'nián': '年',
 
             # 语文教材常见词汇
-            'xué': '学', 'xiào': '校', 'jiā': '家', 'mén': '门', 'fáng': '房', 'shū': '书',
+            'xué': '学', 'jiā': '家', 'mén': '门', 'fáng': '房', 'shū': '书',
             'běn': '本', 'bǐ': '笔', 'zì': '字', 'cí': '词', 'jù': '句', 'duàn': '段',
-            'kè': '课', 'wén': '文', 'dú': '读', 'xiě': '写', 'zuò': '做', 'huà': '话',
-            'tīng': '听', 'kàn': '看', 'xiǎng': '想', 'sī': '思', 'wèn': '问', 'dá': '答',
+            'kè': '课', 'wén': '文', 'sī': '思', 'wèn': '问', 'dá': '答',
             'jiāo': '教', 'yù': '育', 'yǎng': '养', 'xí': '习', 'liàn': '练', 'yóu': '游',
-            'xì': '戏', 'wán': '玩', 'lè': '乐', 'qì': '气', 'qíng': '情', 'gǎn': '感',
-            'jué': '觉', 'zhī': '知', 'dào': '道', 'lǐ': '理', 'yì': '义', 'guān': '关',
-            'yú': '于', 'cóng': '从', 'dào': '到', 'wèi': '为',
+            'xì': '戏', 'wán': '玩', 'qì': '气', 'qíng': '情', 'gǎn': '感',
+            'jué': '觉', 'zhī': '知', 'lǐ': '理', 'yì': '义', 'guān': '关',
+            'cóng': '从', 'dào': '到', 'wèi': '为',
 
             # 动词
-            'qǐ': '起', 'zuò': '坐', 'zǒu': '走', 'pǎo': '跑', 'tiào': '跳', 'chī': '吃',
+            'qǐ': '起', 'zǒu': '走', 'pǎo': '跑', 'tiào': '跳', 'chī': '吃',
             'hē': '喝', 'shuì': '睡', 'zuò': '做', 'shuō': '说', 'xiào': '笑', 'kū': '哭',
             'kàn': '看', 'tīng': '听', 'xiě': '写', 'dú': '读', 'xiǎng': '想', 'jì': '记',
             'wàng': '忘', 'zhǎo': '找', 'děng': '等', 'bāng': '帮', 'jiào': '叫', 'huà': '画',
@@ -61,13 +120,27 @@ class ChineseTextProcessor:
             'lè': '乐', 'kǔ': '苦', 'tián': '甜', 'suān': '酸', 'là': '辣', 'xián': '咸',
 
             # 名词
-            'fù': '父', 'mǔ': '母', 'gē': '哥', 'jiě': '姐', 'dì': '弟', 'mèi': '妹',
+            'fù': '父', 'mǔ': '母', 'gē': '哥', 'jiě': '姐', 'mèi': '妹',
             'shù': '树', 'huā': '花', 'cǎo': '草', 'niǎo': '鸟', 'yú': '鱼', 'mǎ': '马',
             'niú': '牛', 'yáng': '羊', 'gǒu': '狗', 'māo': '猫', 'jī': '鸡', 'yā': '鸭',
             'shān': '山', 'shuǐ': '水', 'tiān': '天', 'dì': '地', 'rì': '日', 'yuè': '月',
             'xīng': '星', 'yún': '云', 'fēng': '风', 'yǔ': '雨', 'xuě': '雪', 'diàn': '电',
         }
 
+        # 所有拼音合并为一个交替正则，整段文本只扫描一次（长的优先匹配）
+        pinyin_keys = sorted(self.pinyin_to_hanzi, key=len, reverse=True)
+        self._pinyin_re = re.compile(
+            r'(?<![\w@.])(' + '|'.join(map(re.escape, pinyin_keys)) + r')(?![\w@.])'
+        )
+
+        # 按原始文本缓存预处理与哈希结果（纯函数，可安全复用）
+        self._preprocess_cached = functools.lru_cache(maxsize=self.CACHE_SIZE)(self._preprocess_for_embedding)
+        self._text_hash_cached = functools.lru_cache(maxsize=self.CACHE_SIZE)(self._compute_text_hash)
+
+        # 跨线程共享的请求节流状态
+        self._rate_lock = threading.Lock()
+        self._next_request_time = 0.0
+
     def preprocess_chinese_text_for_embedding(self, text: str) -> str:
         """
         为向量化预处理中文文本
@@ -81,28 +154,31 @@ class ChineseTextProcessor:
         if not text:
             return text
 
+        return self._preprocess_cached(text)
+
+    def _preprocess_for_embedding(self, text: str) -> str:
+        """预处理流程本体，结果由 preprocess_chinese_text_for_embedding 缓存"""
         # 0. 修复拼音识别错误（最优先）
         text = self._fix_pinyin_errors(text)
 
         # 1. 清理特殊字符和噪音
-        text = re.sub(r'\s+', ' ', text)  # 合并多余空白
-        text = re.sub(r'\n+', ' ', text)  # 合并换行符
+        text = self._RE_WS.sub(' ', text)  # 合并多余空白
+        text = self._RE_NL.sub(' ', text)  # 合并换行符
 
         # 2. 保留中文核心内容（中文字符、标点、数字）
-        text = re.sub(r'[^\u4e00-\u9fff\u3000-\u303f\uff00-\uffef\s，。！？；：""''（）【】《》0-9一二三四五六七八九十]', '', text)
+        text = self._RE_KEEP.sub('', text)
 
         # 3. 标点符号标准化
-        text = text.replace(',', '，').replace('.', '。').replace('!', '！')
-        text = text.replace('?', '？').replace(':', '：').replace(';', '；')
+        text = text.translate(self._PUNCT_TABLE)
 
         # 4. 移除页码、章节标记等噪音
-        text = re.sub(r'\b\d+\s*页\b', '', text)
-        text = re.sub(r'\b第\s*\d+\s*课\b', ' 课文 ', text)  # 保留标记但简化
-        text = re.sub(r'\b第\s*\d+\s*单元\b', ' 单元 ', text)
+        text = self._RE_PAGE.sub('', text)
+        text = self._RE_COURSE.sub(' 课文 ', text)  # 保留标记但简化
+        text = self._RE_UNIT.sub(' 单元 ', text)
 
         # 5. 移除重复标点
-        text = re.sub(r'([。！？]){2,}', r'\1', text)
-        text = re.sub(r'([，]){2,}', r'\1', text)
+        text = self._RE_DUP_END.sub(r'\1', text)
+        text = self._RE_DUP_COMMA.sub(r'\1', text)
 
         # 6. 移除过短的无意义片段
         lines = [line.strip() for line in text.split(' ') if line.strip()]
@@ -126,11 +202,13 @@ class ChineseTextProcessor:
         if not text:
             return text
 
+        # 快速路径：不含ASCII字母的文本不可能有拼音错误，只需修复编码
+        if not self._RE_ASCII_LETTER.search(text):
+            return self._fix_encoding_errors(text)
+
         # 1. 直接替换常见的拼音错误
-        for pinyin, hanzi in self.pinyin_to_hanzi.items():
-            # 使用词边界确保只替换独立的拼音
-            pattern = rf'(?<![\w@.]){re.escape(pinyin)}(?![\w@.])'
-            text = re.sub(pattern, hanzi, text)
+        # 使用词边界确保只替换独立的拼音
+        text = self._pinyin_re.sub(lambda m: self.pinyin_to_hanzi[m.group(1)], text)
 
         # 2. 修复中文-拼音-中文混合模式
         def fix_middle_pinyin(match):
@@ -164,44 +242,42 @@ class ChineseTextProcessor:
         text = re.sub(r'\b([a-zA-Z]{2,6})\b(?=[\u4e00-\u9fff\s])', fix_capitalized_pinyin, text)
 
         # 4. 修复常见的编码错误
-        encoding_fixes = {
-            'ï¼š': '：',
-            'ï¼Œ': '，',
-            'ï¼›': '？',
-            'ï¼': '。',
-            'â€': '"',
-            'â€': '"',
-            'â€¦': '…',
-        }
+        return self._fix_encoding_errors(text)
 
-        for wrong, correct in encoding_fixes.items():
-            text = text.replace(wrong, correct)
-
-        return text
+    def _fix_encoding_errors(self, text: str) -> str:
+        """修复常见的编码错误（一次扫描完成全部替换）"""
+        return self._RE_ENCODING_FIX.sub(lambda m: self.ENCODING_FIXES[m.group(0)], text)
 
     def extract_text_hash(self, text: str) -> str:
         """
-        生成文本内容的MD5哈希值，用于去重
+        生成文本内容的哈希值，用于去重
 
         Args:
             text: 文本内容
 
         Returns:
-            MD5哈希字符串
+            32位十六进制哈希字符串
         """
         if not text:
             return ""
 
+        return self._text_hash_cached(text)
+
+    def _compute_text_hash(self, text: str) -> str:
+        """计算哈希本体，结果由 extract_text_hash 缓存"""
         # 预处理后再计算哈希
         processed_text = self.preprocess_chinese_text_for_embedding(text)
-        return hashlib.md5(processed_text.encode('utf-8')).hexdigest()
+        # 仅用于去重而非安全用途：BLAKE2b 比 MD5 更快，16 字节摘要与原先长度一致
+        return hashlib.blake2b(processed_text.encode('utf-8'), digest_size=16).hexdigest()
 
-    def assess_embedding_quality(self, text: str) -> Dict[str, Any]:
+    def assess_embedding_quality(self, text: str, raw_text: Optional[str] = None) -> Dict[str, Any]:
         """
         评估文本是否适合向量化
 
         Args:
             text: 文本内容
+            raw_text: 预处理前的原始文本；预处理会合并换行，编号行只能在原始文本上识别，
+                未提供时在text上检测
 
         Returns:
             质量评估结果
@@ -227,29 +303,24 @@ class ChineseTextProcessor:
             score += 0.3
 
         # 2. 中文内容比例
-        chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', text))
+        chinese_chars = self._count_chinese_chars(text)
+        chinese_ratio = chinese_chars / length
         if chinese_chars == 0:
             score -= 0.8
             reasons.append('无中文字符')
         else:
-            chinese_ratio = chinese_chars / length
             score += chinese_ratio * 0.4
 
         # 3. 教育内容关键词
-        education_keywords = [
-            '课文', '生字', '词语', '练习', '阅读', '写作', '口语', '交际',
-            '拼音', '识字', '写字', '古诗', '学习', '理解', '背诵',
-            '例句', '造句', '近义词', '反义词', '意思', '解释'
-        ]
-
-        keyword_count = sum(1 for keyword in education_keywords if keyword in text)
+        keyword_count = self._count_education_keywords(text)
         if keyword_count > 0:
             score += min(keyword_count * 0.1, 0.5)
 
         # 4. 结构化内容
-        if re.search(r'[《].*[》]', text):  # 书名号
+        title_start = text.find('《')
+        if title_start != -1 and text.find('》', title_start + 1) != -1:  # 书名号
             score += 0.2
-        if re.search(r'^\d+[[、.]', text, re.MULTILINE):  # 编号
+        if self._RE_NUMBERED_LINE.search(text if raw_text is None else raw_text):  # 编号
             score += 0.1
 
         # 5. 噪音检测
@@ -273,17 +344,45 @@ class ChineseTextProcessor:
             'reason': ', '.join(reasons) if reasons else '质量良好',
             'length': length,
             'chinese_chars': chinese_chars,
-            'chinese_ratio': chinese_ratio / length if length > 0 else 0,
+            'chinese_ratio': chinese_ratio,
             'keyword_count': keyword_count
         }
 
+    @staticmethod
+    def _count_chinese_chars(text: str) -> int:
+        """
+        统计CJK统一汉字（U+4E00–U+9FFF）数量
+
+        按 UTF-32 码点数组做向量化比较，不为每个匹配字符创建对象
+
+        Args:
+            text: 文本内容
+
+        Returns:
+            汉字个数
+        """
+        codepoints = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        return int(((codepoints >= 0x4E00) & (codepoints <= 0x9FFF)).sum())
+
+    def _count_education_keywords(self, text: str) -> int:
+        """
+        统计文本中出现的不同教育关键词数量
+
+        Args:
+            text: 文本内容
+
+        Returns:
+            命中的关键词种类数
+        """
+        return sum(1 for keyword in self.EDUCATION_KEYWORDS if keyword in text)
+
     def batch_vectorize_with_quality_control(
         self,
         text_chunks: List[str],
         batch_size: int = 5,
         max_retries: int = 3,
         quality_threshold: float = 0.4
-    ) -> Tuple[List[List[float]], List[Dict[str, Any]]]:
+    ) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
         """
         批量向量化，包含质量控制
 
@@ -294,97 +393,135 @@ class ChineseTextProcessor:
             quality_threshold: 质量阈值
 
         Returns:
-            (向量列表, 质量评估列表)
+            (向量矩阵 (片段数, 1024) float32, 质量评估列表)
         """
         logger.info(f"开始批处理向量化，总共 {len(text_chunks)} 个片段")
 
-        # 1. 质量预筛选
+        # 1. 文本预处理 + 质量筛选（在清洗后的文本上评估，每个片段只扫描一遍）
+        # 原始序号与预处理文本成对保存，分批时二者不会错位
         quality_results = []
-        suitable_chunks = []
-        suitable_indices = []
+        suitable_pairs = []
 
         for i, chunk in enumerate(text_chunks):
-            quality = self.assess_embedding_quality(chunk)
+            processed = self.preprocess_chinese_text_for_embedding(chunk)
+            if not processed:
+                # 预处理后为空的片段不进入质量评估，也不会发送给向量化API
+                quality_results.append({'is_suitable': False, 'score': 0.0, 'reason': '预处理后为空'})
+                logger.debug(f"跳过预处理后为空的片段 {i}")
+                continue
+
+            quality = self.assess_embedding_quality(processed, raw_text=chunk)
             quality_results.append(quality)
 
             if quality['is_suitable']:
-                suitable_chunks.append(chunk)
-                suitable_indices.append(i)
+                suitable_pairs.append((i, processed))
             else:
                 logger.debug(f"跳过低质量片段 {i}: {quality['reason']}")
 
-        logger.info(f"质量筛选: {len(suitable_chunks)}/{len(text_chunks)} 个片段通过")
-
-        # 2. 文本预处理
-        processed_chunks = []
-        for chunk in suitable_chunks:
-            processed = self.preprocess_chinese_text_for_embedding(chunk)
-            if processed:  # 确保预处理后不为空
-                processed_chunks.append(processed)
-
-        logger.info(f"预处理完成: {len(processed_chunks)} 个有效片段")
+        logger.info(f"质量筛选: {len(suitable_pairs)}/{len(text_chunks)} 个片段通过")
 
-        # 3. 批量向量化
-        all_embeddings = []
+        # 2. 批量向量化（多个批次并发请求，结果按原始序号写入预分配矩阵）
+        # 被过滤或向量化失败的片段对应行保持为零向量
+        final_embeddings = np.zeros((len(text_chunks), self.EMBEDDING_DIMENSION), dtype=np.float32)
         processed_count = 0
 
-        for i in range(0, len(processed_chunks), batch_size):
-            batch = processed_chunks[i:i + batch_size]
-            batch_indices = suitable_indices[i:i + batch_size]
-
-            retry_count = 0
-            batch_success = False
-
-            while not batch_success and retry_count < max_retries:
-                try:
-                    logger.debug(f"处理批次 {i//batch_size + 1}/{(len(processed_chunks)-1)//batch_size + 1}")
-
-                    # 调用向量化API
-                    embeddings = self.embedding_model.embed_documents(batch)
-
-                    # 验证向量维度
-                    if embeddings and len(embeddings[0]) == 1024:  # BGE-M3应该是1024维
-                        all_embeddings.extend(embeddings)
-                        batch_success = True
-                        processed_count += len(batch)
-
-                        # 添加延迟避免API限制
-                        time.sleep(0.5)
-                    else:
-                        logger.warning(f"向量维度异常: {len(embeddings[0]) if embeddings else 'None'}")
-
-                except Exception as e:
-                    retry_count += 1
-                    if retry_count < max_retries:
-                        wait_time = retry_count * 2  # 指数退避
-                        logger.warning(f"批次处理失败，{wait_time}秒后重试 (第{retry_count}次): {e}")
-                        time.sleep(wait_time)
-                    else:
-                        logger.error(f"批次处理最终失败: {e}")
-                        # 为失败的批次添加空向量
-                        all_embeddings.extend([[0.0] * 1024] * len(batch))
+        batches = [
+            tuple(map(list, zip(*suitable_pairs[i:i + batch_size])))
+            for i in range(0, len(suitable_pairs), batch_size)
+        ]
+
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(batches))) as executor:
+                futures = {
+                    executor.submit(self._embed_batch_with_retry, batch, max_retries): batch_indices
+                    for batch_indices, batch in batches
+                }
+                for future in as_completed(futures):
+                    batch_indices = futures[future]
+                    embeddings = future.result()
+                    if embeddings is None:
+                        continue
+                    final_embeddings[batch_indices] = np.asarray(embeddings, dtype=np.float32)
+                    processed_count += len(batch_indices)
 
         logger.info(f"向量化完成: {processed_count} 个片段成功")
 
-        # 4. 结果整合（为被过滤的片段添加空向量）
-        final_embeddings = []
-        final_quality = []
+        return final_embeddings, quality_results
+
+    def _wait_for_rate_limit(self) -> None:
+        """按最小请求间隔节流，多个线程共享同一个时间线"""
+        with self._rate_lock:
+            now = time.monotonic()
+            request_time = max(now, self._next_request_time)
+            self._next_request_time = request_time + self.MIN_REQUEST_INTERVAL
+
+        wait_time = request_time - now
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+    def _defer_requests(self, delay: float) -> None:
+        """把下一次允许发出请求的时间推迟到 delay 秒之后"""
+        with self._rate_lock:
+            self._next_request_time = max(self._next_request_time, time.monotonic() + delay)
+
+    def _retry_delay(self, retry_count: int, error: Exception) -> float:
+        """
+        计算重试等待时间：优先使用服务端 Retry-After，否则为带抖动的指数退避
+
+        Args:
+            retry_count: 当前是第几次失败（从1开始）
+            error: 本次失败的异常
+
+        Returns:
+            等待秒数
+        """
+        response = getattr(error, 'response', None)
+        retry_after = getattr(response, 'headers', {}).get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                return min(self.RETRY_MAX_DELAY, float(retry_after))
+            except ValueError:
+                pass
+
+        delay = min(self.RETRY_MAX_DELAY, self.RETRY_BASE_DELAY * 2 ** retry_count)
+        return delay * random.uniform(0.5, 1.5)
+
+    def _embed_batch_with_retry(self, batch: List[str], max_retries: int) -> Optional[List[List[float]]]:
+        """
+        向量化单个批次，失败时重试
 
-        for i, original_chunk in enumerate(text_chunks):
-            if i in suitable_indices:
-                # 找到对应的嵌入向量
-                idx = suitable_indices.index(i)
-                if idx < len(all_embeddings):
-                    final_embeddings.append(all_embeddings[idx])
+        Args:
+            batch: 预处理后的文本批次
+            max_retries: 最大重试次数
+
+        Returns:
+            向量列表；重试耗尽时返回 None
+        """
+        for retry_count in range(1, max_retries + 1):
+            try:
+                self._wait_for_rate_limit()
+
+                # 调用向量化API
+                embeddings = self.embedding_model.embed_documents(batch)
+
+                # 验证向量维度
+                if embeddings and len(embeddings[0]) == self.EMBEDDING_DIMENSION:  # BGE-M3应该是1024维
+                    if len(embeddings) == len(batch):
+                        return embeddings
+                    raise ValueError(f"向量数量异常: {len(embeddings)} (期望: {len(batch)})")
+
+                raise ValueError(f"向量维度异常: {len(embeddings[0]) if embeddings else 'None'}")
+
+            except Exception as e:
+                if retry_count < max_retries:
+                    wait_time = self._retry_delay(retry_count, e)
+                    logger.warning(f"批次处理失败，{wait_time:.1f}秒后重试 (第{retry_count}次): {e}")
+                    # 推迟共享时间线，所有并发批次一起退避，由下一次节流等待完成休眠
+                    self._defer_requests(wait_time)
                 else:
-                    final_embeddings.append([0.0] * 1024)  # 安全默认值
-                final_quality.append(quality_results[i])
-            else:
-                # 被过滤的片段
-                final_embeddings.append([0.0] * 1024)
-                final_quality.append(quality_results[i])
+                    logger.error(f"批次处理最终失败: {e}")
 
-        return final_embeddings, final_quality
+        return None
 
     def get_processing_stats(self) -> Dict[str, Any]:
         """
@@ -396,7 +533,7 @@ class ChineseTextProcessor:
         return {
             'embedding_model': type(self.embedding_model).__name__,
             'supports_batch': True,
-            'vector_dimension': 1024,
+            'vector_dimension': self.EMBEDDING_DIMENSION,
             'quality_threshold': 0.4,
             'default_batch_size': 5,
             'max_retries': 3
@@ -5,13 +5,31 @@ Chinese Textbook Intelligent Analyzer
 专门用于分析人教版语文教材的单元、课文结构
 """
 
+import copy
+import hashlib
 import re
-from typing import List, Dict, Any, Optional, Tuple
+from bisect import bisect_left, bisect_right
+from typing import List, Dict, Any, Callable, Iterable, Optional, Set, Tuple
+from collections import OrderedDict
 from dataclasses import dataclass
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 中文数字
+_CHINESE_DIGITS = {
+    '一': 1, '二': 2, '三': 3, '四': 4, '五': 5,
+    '六': 6, '七': 7, '八': 8, '九': 9, '十': 10
+}
+
+# 中文/阿拉伯数字 -> 整数：一到十、十几、几十（整十），以及 1-99
+_CHINESE_TO_INT = {
+    **{str(i): i for i in range(1, 100)},
+    **_CHINESE_DIGITS,
+    **{f'{char}十': value * 10 for char, value in _CHINESE_DIGITS.items()},
+    **{f'十{char}': 10 + value for char, value in _CHINESE_DIGITS.items()},
+}
+
 
 @dataclass
 class LessonInfo:
@@ -44,21 +62,24 @@ class TextbookStructure:
 class ChineseTextbookAnalyzer:
     """语文教材智能分析器"""
 
+    # 教材结构缓存最多保留的分析结果数，超出时淘汰最久未使用的
+    STRUCTURE_CACHE_SIZE = 4
+
     def __init__(self):
         """初始化分析器"""
         # 单元识别模式 - 基于实际PDF目录页格式
-        self.unit_patterns = [
+        self.unit_patterns = [re.compile(p) for p in (
             r'第([一二三四五六七八九十\d]+)单元\s*',
             r'([一二三四五六七八九十\d]+)、([^。\n]*单元)',
-        ]
+        )]
 
         # 课文识别模式 - 基于实际PDF目录页格式
-        self.lesson_patterns = [
+        self.lesson_patterns = [re.compile(p) for p in (
             r'\s*(\d+)\s+([^。\n]{2,30})(?:\.\.\.\.\.\.\.)?',  # 目录中的格式：1 大青树下的小学.......
             r'第([一二三四五六七八九十\d]+)课\s*([^\n]{2,30})',
             r'(\d+)、([^。\n]{2,30})(?:课|篇)',
             r'([《][^《》]{2,30}[》])',
-        ]
+        )]
 
         # 人教版三年级上册语文已知课文标题 (完整列表)
         self.known_lessons = {
@@ -115,33 +136,91 @@ class ChineseTextbookAnalyzer:
             ]
         }
 
+        # 分析结果LRU缓存：键为按页码排序后所有片段（页码、chunk_id、完整内容）的blake2b摘要
+        self._structure_cache: "OrderedDict[bytes, TextbookStructure]" = OrderedDict()
+
+        # 单元/章节分隔标记（口语交际、习作、语文园地、习作例文），一次扫描判断
+        self._section_marker_re = re.compile(r'单元|口语交际|习作|语文园地')
+
+        # 页码到单元的映射（根据实际页码）
+        self.unit_page_ranges = {
+            1: (2, 12),   # 第一单元：页2-12
+            2: (13, 26),  # 第二单元：页13-26
+            3: (27, 44),  # 第三单元：页27-44
+            4: (45, 62),  # 第四单元：页45-62
+            5: (63, 72),  # 第五单元：页63-72
+            6: (73, 86),  # 第六单元：页73-86
+            7: (87, 100), # 第七单元：页87-100
+            8: (101, 113) # 第八单元：页101-113
+        }
+
+        # 按页码直接查表得到单元编号（0 表示不属于任何单元）
+        self._page_to_unit = [0] * (max(end for _, end in self.unit_page_ranges.values()) + 1)
+        for unit_num, (start_page, end_page) in self.unit_page_ranges.items():
+            self._page_to_unit[start_page:end_page + 1] = [unit_num] * (end_page - start_page + 1)
+
+        # 每个单元的已知课文标题合并为一个交替正则（长标题优先，太短的标题不参与匹配），
+        # 一次扫描找出片段中出现的本单元课文
+        self._unit_title_res = {}
+        for unit_num, titles in self.known_lessons.items():
+            candidates = sorted({title for title in titles if len(title) > 3}, key=len, reverse=True)
+            if candidates:
+                self._unit_title_res[unit_num] = re.compile('|'.join(map(re.escape, candidates)))
+
         # 章节和练习识别
-        self.section_patterns = [
+        self.section_patterns = [re.compile(p) for p in (
             r'(口语交际：[^\n]{2,30})',
             r'(习作：[^\n]{2,30})',
             r'(语文园地)',
             r'(习作例文：[^\n]{2,30})',
             r'(我爱故乡的杨梅)',
             r'(我们眼中的缤纷世界)',
-        ]
+        )]
+
+        # 目录页解析：单元标记与 "编号 标题.....页码" 形式的课文条目合并为一个正则，
+        # 一次扫描按 lastgroup 分派；课文标题不会跨越单元标记
+        unit_marker = r'第[一二三四五六七八九十\d]+单元'
+        self._directory_re = re.compile(
+            r'(?P<unit>第(?P<unit_num>[一二三四五六七八九十\d]+)单元)'
+            r'|(?P<lesson>(?P<lesson_num>\d+)\s+'
+            rf'(?P<lesson_title>(?:(?!{unit_marker})[^。\n]){{2,30}})'
+            r'(?:\*{0,2})(?:\.{4,})?\s*(?P<lesson_page>\d+))'
+        )
 
     def analyze_textbook_structure(self, chunks: List[Dict[str, Any]]) -> TextbookStructure:
         """
         分析教材结构
 
+        同一分析器对相同的片段（页码、chunk_id、完整内容均一致）重复分析时返回缓存结果的副本，
+        调用方修改返回值不会影响缓存；需要强制重新分析时先调用 clear_cache()
+
+        命中缓存时仍要对全部内容计算摘要并深拷贝结果（含各课文的内容片段），
+        开销与文本总量成正比，但省去了目录解析和课文识别
+
         Args:
             chunks: PDF处理后的文本片段列表
 
         Returns:
             教材结构信息
         """
-        logger.info("开始分析语文教材结构")
-
         # 按页码排序
         sorted_chunks = sorted(chunks, key=lambda x: x.get('page_number', 0))
 
-        # 先从目录页提取所有单元信息
-        units = self._extract_units_from_directory(sorted_chunks)
+        # 相同输入直接返回上次的分析结果（副本）
+        cache_key = self._structure_cache_key(sorted_chunks)
+        cached = self._structure_cache.get(cache_key)
+        if cached is not None:
+            logger.info("教材结构命中缓存")
+            self._structure_cache.move_to_end(cache_key)
+            return copy.deepcopy(cached)
+
+        logger.info("开始分析语文教材结构")
+
+        # 合并目录页内容
+        directory_content = self._collect_directory_content(sorted_chunks)
+
+        # 先从目录页提取所有单元和课文信息
+        units, directory_lessons = self._parse_directory(directory_content)
 
         # 如果没有找到足够单元，使用通用方法
         if len(units) < 4:  # 至少应该有4个单元
@@ -149,7 +228,7 @@ class ChineseTextbookAnalyzer:
             units = self._extract_units(sorted_chunks)
 
         # 识别课文
-        lessons = self._extract_lessons(sorted_chunks, units)
+        lessons = self._extract_lessons(sorted_chunks, units, directory_lessons)
 
         # 分配内容到课文
         self._assign_content_to_lessons(sorted_chunks, lessons)
@@ -162,31 +241,59 @@ class ChineseTextbookAnalyzer:
         )
 
         logger.info(f"分析完成：{len(lessons)} 篇课文，{len(units)} 个单元")
+        # 缓存独立的副本，不与返回给调用方的对象共享
+        self._structure_cache[cache_key] = copy.deepcopy(structure)
+        if len(self._structure_cache) > self.STRUCTURE_CACHE_SIZE:
+            self._structure_cache.popitem(last=False)
         return structure
 
-    def _extract_units_from_directory(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """从目录页提取所有8个单元信息"""
-        units = []
-        directory_content = ""
+    @staticmethod
+    def _structure_cache_key(sorted_chunks: List[Dict[str, Any]]) -> bytes:
+        """按片段的页码、chunk_id和完整内容计算缓存键，内容带长度前缀，拼接边界不会产生歧义"""
+        digest = hashlib.blake2b(digest_size=16)
+        for chunk in sorted_chunks:
+            content = chunk['content'].encode('utf-8')
+            digest.update(f"{chunk.get('page_number', 0)}|{chunk.get('chunk_id')}|{len(content)}|".encode('utf-8'))
+            digest.update(content)
+        return digest.digest()
+
+    def clear_cache(self):
+        """清空教材结构缓存"""
+        self._structure_cache.clear()
+
+    def _collect_directory_content(self, chunks: List[Dict[str, Any]]) -> str:
+        """合并目录页内容（第4和第5页）"""
+        # 检查是否是目录页
+        parts = [
+            chunk['content'] for chunk in chunks
+            if chunk.get('page_number', 0) in (4, 5) and ('目录' in chunk['content'] or '单元' in chunk['content'])
+        ]
+        # 每段内容后都跟一个换行，与逐段拼接的结果一致
+        return "\n".join(parts) + "\n" if parts else ""
 
-        # 合并目录页内容（第4和第5页）
-        for chunk in chunks:
-            page = chunk.get('page_number', 0)
-            content = chunk['content']
+    def _parse_directory(self, directory_content: str) -> Tuple[List[Dict[str, Any]], List[LessonInfo]]:
+        """
+        解析目录页：一次扫描同时提取单元和课文信息
 
-            # 检查是否是目录页
-            if page in [4, 5] and ('目录' in content or '单元' in content):
-                directory_content += content + "\n"
+        Args:
+            directory_content: 合并后的目录页内容
 
-        if directory_content:
-            logger.info("从目录页提取单元信息")
+        Returns:
+            (单元信息列表（补齐并只保留前8个单元）, 目录中的课文列表)
+        """
+        units = []
+        lessons = []
 
-            # 提取所有单元模式
-            unit_pattern = r'第([一二三四五六七八九十\d]+)单元'
-            unit_matches = re.findall(unit_pattern, directory_content)
+        if not directory_content:
+            return units, lessons
 
-            for unit_chinese in unit_matches:
-                unit_number = self._chinese_number_to_int(unit_chinese)
+        logger.info("从目录页提取单元和课文信息")
+
+        # 遇到单元标记时记录单元并切换当前单元，之后的课文条目归入该单元
+        unit_number = None
+        for match in self._directory_re.finditer(directory_content):
+            if match.lastgroup == 'unit':
+                unit_number = self._chinese_number_to_int(match.group('unit_num'))
                 unit_info = {
                     'page': 4,  # 目录页统一设为第4页
                     'unit_number': unit_number,
@@ -195,24 +302,45 @@ class ChineseTextbookAnalyzer:
                     'chunk_id': 'directory_page'
                 }
                 units.append(unit_info)
-                logger.debug(f"从目录提取单元: 第{unit_number}单元")
-
-            # 确保所有8个单元都被包含
-            if len(units) < 8:
-                logger.info(f"目录页只找到{len(units)}个单元，补充完整的8个单元")
-                found_numbers = {u['unit_number'] for u in units}
-                for i in range(1, 9):
-                    if i not in found_numbers:
-                        unit_info = {
-                            'page': 4,
-                            'unit_number': i,
-                            'unit_title': f"第{i}单元",
-                            'content': f"第{i}单元",
-                            'chunk_id': 'directory_page'
-                        }
-                        units.append(unit_info)
-
-        return sorted(units, key=lambda x: x['unit_number'])[:8]  # 确保只返回前8个单元
+                logger.debug("从目录提取单元: 第%s单元", unit_number)
+                continue
+
+            # 第一个单元标记之前的内容不属于任何单元
+            if unit_number is None:
+                continue
+
+            lesson_num_str, lesson_title, page_num = match.group('lesson_num', 'lesson_title', 'lesson_page')
+            lesson_title = lesson_title.strip()
+            if (len(lesson_title) > 1 and
+                not any(skip in lesson_title for skip in ['口语', '习作', '语文园地', '快乐读书吧', '识字表', '写字表', '词语表'])):
+
+                lesson = LessonInfo(
+                    unit_number=unit_number,
+                    unit_title=f"第{unit_number}单元",
+                    lesson_number=int(lesson_num_str),
+                    lesson_title=lesson_title,
+                    start_page=int(page_num)
+                )
+                lessons.append(lesson)
+                logger.debug("目录提取课文: 第%s单元 第%s课 %s (页%s)", unit_number, lesson_num_str, lesson_title, page_num)
+
+        # 确保所有8个单元都被包含
+        if len(units) < 8:
+            logger.info(f"目录页只找到{len(units)}个单元，补充完整的8个单元")
+            found_numbers = {u['unit_number'] for u in units}
+            for i in range(1, 9):
+                if i not in found_numbers:
+                    unit_info = {
+                        'page': 4,
+                        'unit_number': i,
+                        'unit_title': f"第{i}单元",
+                        'content': f"第{i}单元",
+                        'chunk_id': 'directory_page'
+                    }
+                    units.append(unit_info)
+
+        units = sorted(units, key=lambda x: x['unit_number'])[:8]  # 确保只返回前8个单元
+        return units, lessons
 
     def _extract_units(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """提取单元信息"""
@@ -225,7 +353,7 @@ class ChineseTextbookAnalyzer:
 
             # 尝试匹配单元模式
             for pattern in self.unit_patterns:
-                matches = re.finditer(pattern, content)
+                matches = pattern.finditer(content)
                 for match in matches:
                     # 提取单元编号
                     unit_number_str = match.group(1)
@@ -250,224 +378,164 @@ class ChineseTextbookAnalyzer:
                     }
                     units.append(unit_info)
                     seen_units.add(unit_number)
-                    logger.debug(f"发现单元: {unit_info['unit_number']} - {unit_info['unit_title']} (页{page})")
+                    logger.debug("发现单元: %s - %s (页%s)", unit_info['unit_number'], unit_info['unit_title'], page)
 
         return sorted(units, key=lambda x: x['page'])
 
-    def _extract_lessons(self, chunks: List[Dict[str, Any]], units: List[Dict[str, Any]]) -> List[LessonInfo]:
+    def _extract_lessons(self, chunks: List[Dict[str, Any]], units: List[Dict[str, Any]],
+                         directory_lessons: List[LessonInfo]) -> List[LessonInfo]:
         """提取课文信息"""
         lessons = []
-        seen_lessons = set()
+        seen_lessons = set()  # 已在内容页处理过的课文
         unit_lesson_count = {}
 
-        # 1. 首先从目录页提取所有课文信息
-        directory_lessons = self._extract_lessons_from_directory(chunks)
-        lessons.extend(directory_lessons)
+        # 1. 首先加入目录页提取的课文（同一单元同名课文只保留第一条），
+        #    同时记录目录中的课文编号
+        directory_numbers = {}
+        for dir_lesson in directory_lessons:
+            lesson_key = (dir_lesson.unit_number, dir_lesson.lesson_title)
+            if lesson_key not in directory_numbers:
+                directory_numbers[lesson_key] = dir_lesson.lesson_number
+                lessons.append(dir_lesson)
 
         # 2. 然后在内容页查找实际课文位置
-        # 创建页码到单元的映射（根据实际页码）
-        unit_page_ranges = {
-            1: (2, 12),   # 第一单元：页2-12
-            2: (13, 26),  # 第二单元：页13-26
-            3: (27, 44),  # 第三单元：页27-44
-            4: (45, 62),  # 第四单元：页45-62
-            5: (63, 72),  # 第五单元：页63-72
-            6: (73, 86),  # 第六单元：页73-86
-            7: (87, 100), # 第七单元：页87-100
-            8: (101, 113) # 第八单元：页101-113
-        }
-
         for chunk in chunks:
             content = chunk['content']
             page = chunk.get('page_number', 0)
 
-            # 确定当前单元
+            # 确定当前单元（页码查表）
             current_unit = None
-            for unit_num, (start_page, end_page) in unit_page_ranges.items():
-                if start_page <= page <= end_page:
-                    current_unit = {
-                        'unit_number': unit_num,
-                        'unit_title': f"第{unit_num}单元"
-                    }
-                    break
+            unit_num = self._page_to_unit[page] if 0 <= page < len(self._page_to_unit) else 0
+            if unit_num:
+                current_unit = {
+                    'unit_number': unit_num,
+                    'unit_title': f"第{unit_num}单元"
+                }
 
             # 如果能确定单元，查找课文内容
             if current_unit:
                 unit_num = current_unit['unit_number']
 
                 # 使用已知课文列表匹配
-                if unit_num in self.known_lessons:
-                    known_lessons = self.known_lessons[unit_num]
-                    for lesson_title in known_lessons:
-                        if lesson_title in content and len(lesson_title) > 3:  # 避免太短的匹配
+                unit_title_re = self._unit_title_res.get(unit_num)
+                titles_in_content = set(unit_title_re.findall(content)) if unit_title_re else set()
+                if titles_in_content:
+                    # 按已知课文顺序处理命中的标题
+                    for lesson_title in self.known_lessons[unit_num]:
+                        if lesson_title in titles_in_content:  # 已排除太短的标题
                             # 避免重复添加
                             lesson_key = (unit_num, lesson_title)
                             if lesson_key in seen_lessons:
                                 continue
 
                             # 查找对应的目录课文信息来获取正确的课文编号
-                            lesson_number = None
-                            for dir_lesson in directory_lessons:
-                                if (dir_lesson.unit_number == unit_num and
-                                    dir_lesson.lesson_title == lesson_title):
-                                    lesson_number = dir_lesson.lesson_number
-                                    break
-
-                            # 如果在目录中没找到，使用计数
+                            lesson_number = directory_numbers.get(lesson_key)
+
+                            # 如果在目录中没找到，使用计数并添加课文；
+                            # 目录中已有的课文不重复添加，只用于更新编号计数
                             if lesson_number is None:
                                 lesson_number = unit_lesson_count.get(unit_num, 0) + 1
+                                lesson = LessonInfo(
+                                    unit_number=unit_num,
+                                    unit_title=current_unit['unit_title'],
+                                    lesson_number=lesson_number,
+                                    lesson_title=lesson_title,
+                                    start_page=page
+                                )
+                                lessons.append(lesson)
 
-                            lesson = LessonInfo(
-                                unit_number=unit_num,
-                                unit_title=current_unit['unit_title'],
-                                lesson_number=lesson_number,
-                                lesson_title=lesson_title,
-                                start_page=page
-                            )
-                            lessons.append(lesson)
                             seen_lessons.add(lesson_key)
                             unit_lesson_count[unit_num] = lesson_number
-                            logger.debug(f"在内容页找到课文: {lesson_title} (第{unit_num}单元, 第{lesson_number}课, 页{page})")
-
-        # 合并并去重
-        final_lessons = []
-        seen_final = set()
-        for lesson in lessons:
-            lesson_key = (lesson.unit_number, lesson.lesson_title)
-            if lesson_key not in seen_final:
-                final_lessons.append(lesson)
-                seen_final.add(lesson_key)
-
-        return final_lessons
-
-    def _extract_lessons_from_directory(self, chunks: List[Dict[str, Any]]) -> List[LessonInfo]:
-        """从目录页提取课文信息"""
-        lessons = []
-        directory_content = ""
-
-        # 合并目录页内容（第4和第5页）
-        for chunk in chunks:
-            page = chunk.get('page_number', 0)
-            content = chunk['content']
-
-            # 检查是否是目录页
-            if page in [4, 5] and ('目录' in content or '单元' in content):
-                directory_content += content + "\n"
-
-        if directory_content:
-            logger.info("从目录页提取课文信息")
-
-            # 按单元分割内容
-            unit_sections = re.split(r'第([一二三四五六七八九十\d]+)单元', directory_content)
-
-            current_unit = 1
-            for i in range(1, len(unit_sections), 2):  # 跳过第0个空元素，然后每两个一组
-                if i >= len(unit_sections) - 1:
-                    break
-
-                unit_chinese = unit_sections[i]
-                unit_content = unit_sections[i + 1]
-
-                unit_number = self._chinese_number_to_int(unit_chinese)
-
-                # 在单元内容中查找课文
-                lesson_pattern = r'(\d+)\s+([^。\n]{2,30})(?:\*{0,2})(?:\.{4,})?\s*(\d+)'
-                lesson_matches = re.findall(lesson_pattern, unit_content)
-
-                lesson_counter = 1
-                for lesson_num_str, lesson_title, page_num in lesson_matches:
-                    lesson_title = lesson_title.strip()
-                    if (len(lesson_title) > 1 and
-                        not any(skip in lesson_title for skip in ['口语', '习作', '语文园地', '快乐读书吧', '识字表', '写字表', '词语表'])):
-
-                        lesson = LessonInfo(
-                            unit_number=unit_number,
-                            unit_title=f"第{unit_number}单元",
-                            lesson_number=int(lesson_num_str),
-                            lesson_title=lesson_title,
-                            start_page=int(page_num)
-                        )
-                        lessons.append(lesson)
-                        logger.debug(f"目录提取课文: 第{unit_number}单元 第{lesson_num_str}课 {lesson_title} (页{page_num})")
-                        lesson_counter += 1
+                            logger.debug("在内容页找到课文: %s (第%s单元, 第%s课, 页%s)", lesson_title, unit_num, lesson_number, page)
 
         return lessons
 
+    @staticmethod
+    def _build_title_finder(titles: Iterable[str]) -> Callable[[str], Set[str]]:
+        """
+        构建标题查找函数：返回内容中出现的所有标题
+        """
+        titles = set(titles)
+        return lambda content: {title for title in titles if title in content}
+
     def _assign_content_to_lessons(self, chunks: List[Dict[str, Any]], lessons: List[LessonInfo]):
         """将内容分配到对应的课文"""
+        # 每个片段只扫描一次：出现了哪些课文标题、是否含单元/章节标记。
+        # 片段已按页码排序，每篇课文用二分查找截取自己页面范围内的片段
+        find_titles = self._build_title_finder(lesson.lesson_title for lesson in lessons)
+        chunk_pages = [chunk.get('page_number', 0) for chunk in chunks]
+        chunk_view = [
+            (page, chunk['content'], find_titles(chunk['content']),
+             self._has_section_marker(chunk['content']), chunk)
+            for page, chunk in zip(chunk_pages, chunks)
+        ]
+
+        # 循环中用到的课文起始页预先取成列表，按下标访问
+        start_pages = [lesson.start_page for lesson in lessons]
+        lesson_count = len(lessons)
 
         for i, lesson in enumerate(lessons):
             # 确定课文的页面范围
-            start_page = lesson.start_page
-            end_page = lessons[i + 1].start_page - 1 if i + 1 < len(lessons) else 999
-
-            # 查找此课文页面范围内的所有片段
-            for chunk in chunks:
-                page = chunk.get('page_number', 0)
-
-                # 检查是否在课文的页面范围内
-                if start_page <= page <= end_page:
-                    # 验证内容是否属于此课文
-                    content = chunk['content']
-
-                    # 如果是课文的起始页面，确保包含课文标题
-                    if page == start_page and lesson.lesson_title in content:
-                        lesson.content_chunks.append(chunk)
-                    # 如果不是起始页面，检查是否包含相关内容
-                    elif page > start_page:
-                        # 排除明显是其他课文或章节的内容
-                        is_other_content = self._is_content_from_other_lesson(content, lesson, lessons)
-                        if not is_other_content:
-                            lesson.content_chunks.append(chunk)
-
-            # 设置课文的结束页面
-            if lesson.content_chunks:
-                lesson.end_page = max(chunk.get('page_number', 0) for chunk in lesson.content_chunks)
-                logger.debug(f"课文 {lesson.lesson_title}: 页{lesson.start_page}-{lesson.end_page}, {len(lesson.content_chunks)} 个片段")
-
-    def _is_content_from_other_lesson(self, content: str, current_lesson: LessonInfo, all_lessons: List[LessonInfo]) -> bool:
-        """检查内容是否来自其他课文"""
+            start_page = start_pages[i]
+            end_page = start_pages[i + 1] - 1 if i + 1 < lesson_count else 999
+            lesson_title = lesson.lesson_title
+            content_chunks = lesson.content_chunks
+            last_page = None
+
+            # 查找此课文页面范围内的所有片段（按页码升序）
+            lo = bisect_left(chunk_pages, start_page)
+            hi = bisect_right(chunk_pages, end_page, lo)
+            for page, content, titles_in_content, has_section_marker, chunk in chunk_view[lo:hi]:
+                # 验证内容是否属于此课文
+                # 如果是课文的起始页面，确保包含课文标题
+                if page == start_page and lesson_title in content:
+                    content_chunks.append(chunk)
+                    last_page = page
+                # 如果不是起始页面，检查是否包含相关内容
+                elif page > start_page:
+                    # 排除明显是其他课文或章节的内容
+                    is_other_content = self._is_content_from_other_lesson(
+                        content, lesson, titles_in_content, has_section_marker
+                    )
+                    if not is_other_content:
+                        content_chunks.append(chunk)
+                        last_page = page
+
+            # 设置课文的结束页面：页码升序遍历，最后分配的片段页码即最大页码
+            if last_page is not None:
+                lesson.end_page = last_page
+                logger.debug("课文 %s: 页%s-%s, %d 个片段",
+                             lesson.lesson_title, lesson.start_page, lesson.end_page, len(lesson.content_chunks))
+
+    def _is_content_from_other_lesson(self, content: str, current_lesson: LessonInfo,
+                                      titles_in_content: Set[str], has_section_marker: bool) -> bool:
+        """检查内容是否来自其他课文（标题集合与章节标记由调用方按片段预先计算）"""
 
         # 检查是否包含其他课文标题
-        for lesson in all_lessons:
-            if lesson.lesson_title != current_lesson.lesson_title and lesson.lesson_title in content:
-                return True
-
-        # 检查是否包含单元标题
-        if "单元" in content and current_lesson.unit_title not in content:
+        current_title = current_lesson.lesson_title
+        if any(title != current_title for title in titles_in_content):
             return True
 
-        # 检查是否是章节分隔内容
-        sections = ["口语交际", "习作", "语文园地", "习作例文"]
-        for section in sections:
-            if section in content and current_lesson.unit_title not in content:
-                return True
+        # 检查是否包含单元标题或章节分隔内容
+        if has_section_marker and current_lesson.unit_title not in content:
+            return True
 
         return False
 
+    def _has_section_marker(self, content: str) -> bool:
+        """检查内容是否包含单元标题或章节分隔标记"""
+        return self._section_marker_re.search(content) is not None
+
     def _chinese_number_to_int(self, chinese_num: str) -> int:
         """将中文数字转换为整数"""
-        chinese_map = {
-            '一': 1, '二': 2, '三': 3, '四': 4, '五': 5,
-            '六': 6, '七': 7, '八': 8, '九': 9, '十': 10
-        }
+        value = _CHINESE_TO_INT.get(chinese_num)
+        if value is not None:
+            return value
 
-        # 如果是阿拉伯数字，直接返回
+        # 表外的阿拉伯数字，直接转换
         if chinese_num.isdigit():
             return int(chinese_num)
 
-        # 如果是中文数字，进行转换
-        if chinese_num in chinese_map:
-            return chinese_map[chinese_num]
-
-        # 处理十几的情况
-        if len(chinese_num) == 2 and chinese_num[0] == '十':
-            return 10 + chinese_map.get(chinese_num[1], 0)
-
-        # 处理二十几到九十几的情况
-        if len(chinese_num) == 2 and chinese_num[1] == '十':
-            return chinese_map.get(chinese_num[0], 0) * 10
-
         return 1  # 默认值
 
     def get_lesson_statistics(self, structure: TextbookStructure) -> Dict[str, Any]:
@@ -5,9 +5,19 @@ PDF Document Processor for Homework Pal
 针对人教版教材PDF的智能解析和内容提取
 """
 
+import copy
+import hashlib
+import json
 import os
+import pickle
 import re
-from typing import List, Dict, Any, Optional, Tuple
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
+from functools import partial
+from itertools import islice, repeat
+from pathlib import Path
+from typing import Callable, Iterator, List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime
 import logging
 
@@ -28,14 +38,117 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# 预编译的正则表达式，避免每页重复查找re模块缓存
+_RE_WS = re.compile(r'\s+')
+_RE_BLANKLINE = re.compile(r'\n\s*\n')
+_RE_INLINE_WS = re.compile(r'[^\S\n]+')
+_RE_PAGE_NUM_A = re.compile(r'\b\d+\s*页\b')
+_RE_PAGE_NUM_B = re.compile(r'\b页\s*\d+\b')
+# 中文预处理保留的字符：CJK统一汉字、CJK标点、全角字符、空白、数字、半角双引号及常用中文标点
+_RE_CHINESE_KEEP = re.compile(r'[^\u4e00-\u9fff\u3000-\u303f\uff00-\uffef\s\d"，。！？；：（）【】《》]')
+_RE_LESSON_NUMBER = re.compile(r'第?\s*([一二三四五六七八九十\d]+)\s*课')
+
+# 文件名教育元数据关键词：(字段, 取值, 区分大小写的关键词, 小写匹配的关键词)
+# 同一字段内按表中顺序确定优先级，排在前面的规则优先
+_EDUCATION_KEYWORDS = (
+    ('subject', '数学', ('数学',), ('math',)),
+    ('subject', '语文', ('语文',), ('chinese',)),
+    ('subject', '英语', ('英语',), ('english',)),
+    ('subject', '科学', ('科学',), ('science',)),
+    ('grade', '一年级', ('一年级', 'grade1', '1年级'), ()),
+    ('grade', '二年级', ('二年级', 'grade2', '2年级'), ()),
+    ('grade', '三年级', ('三年级', 'grade3', '3年级', '三上'), ()),
+    ('grade', '四年级', ('四年级', 'grade4', '4年级'), ()),
+    ('grade', '五年级', ('五年级', 'grade5', '5年级'), ()),
+    ('grade', '六年级', ('六年级', 'grade6', '6年级'), ()),
+    ('semester', '上学期', ('上',), ('first',)),
+    ('semester', '下学期', ('下',), ('second',)),
+    ('publisher', '人教版', ('人教',), ('pep',)),
+    ('publisher', '苏教版', ('苏教',), ()),
+    ('publisher', '北师大版', ('北师',), ()),
+)
+
+
+# 关键词（小写）到规则序号的映射
+_EDUCATION_KEYWORD_RANKS = {
+    keyword: rank
+    for rank, (_, _, cased_keywords, lowered_keywords) in enumerate(_EDUCATION_KEYWORDS)
+    for keyword in cased_keywords + lowered_keywords
+}
+
+# 所有关键词合成一个正则，一次扫描文件名；小写匹配的关键词用(?i:...)忽略大小写。
+# 放在零宽前瞻里，使每个位置都能命中，重叠的关键词（如"三上"与"上"）不会互相吞掉
+_RE_EDUCATION_KEYWORDS = re.compile('(?=({}))'.format('|'.join(
+    [re.escape(keyword) for rule in _EDUCATION_KEYWORDS for keyword in rule[2]] +
+    ['(?i:{})'.format(re.escape(keyword)) for rule in _EDUCATION_KEYWORDS for keyword in rule[3]]
+)))
+
+# 文本提取标志：保留页面裁剪和未知字符的CID映射，拆开连字并合并断词；
+# 不保留原始空白（后续清理会统一空白），省去PyMuPDF的相应处理
+_TEXT_FLAGS = (
+    fitz.TEXT_MEDIABOX_CLIP | fitz.TEXT_CID_FOR_UNKNOWN_UNICODE | fitz.TEXT_DEHYPHENATE
+    if PYMUPDF_AVAILABLE else 0
+)
+
+# 结构识别的判定顺序（优先级从高到低）
+_STRUCTURE_SECTIONS = ('lesson_title', 'vocabulary', 'exercise', 'unit_review',
+                       'writing', 'ancient_poem', 'character')
+
+# 任何结构模式的最短命中都有3个字（如"生字表"、"练习一"、"1课："），更短的文本无需匹配
+_MIN_STRUCTURE_TEXT_LENGTH = 3
+
+# 各结构类型对应的 (内容类型, 语言重点, 难度等级)
+_STRUCTURE_TYPES = {
+    'lesson_title': ('课文', '阅读理解', 2),
+    'vocabulary': ('生字词', '识字', 1),
+    'exercise': ('练习题', '理解应用', 3),
+    'unit_review': ('单元复习', '综合复习', 2),
+    'writing': ('写作指导', '写作', 3),
+    'ancient_poem': ('古诗词', '古诗欣赏', 2),
+    'character': ('识字', '识字', 1),
+}
+
+
+def _open_pdf(pdf_path: str, stream_max_bytes: int):
+    """
+    打开PDF文件：不超过stream_max_bytes的文件一次顺序读入内存再交给PyMuPDF，
+    之后的解析都在内存中进行，不再逐页随机读盘；更大的文件按路径打开，避免占用过多内存
+    """
+    with open(pdf_path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= stream_max_bytes:
+            return fitz.open(stream=f.read(), filetype='pdf')
+    return fitz.open(pdf_path)
+
+
+def _extract_pages_worker(pdf_path: str, page_range: range,
+                          extract_page: Callable[[Any, int], Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """进程池工作函数：自行打开PDF（fitz文档不能跨进程传递），提取一段连续页面"""
+    with fitz.open(pdf_path) as doc:
+        pages = enumerate(doc.pages(page_range.start, page_range.stop), start=page_range.start + 1)
+        return [page_info for page_info in (extract_page(page, page_number) for page_number, page in pages)
+                if page_info is not None]
+
 
 class PDFProcessor:
     """PDF文档处理器"""
 
+    # 页数达到该值才启用多进程逐页提取，页数少时进程启动开销不划算
+    PARALLEL_MIN_PAGES = 8
+    MAX_WORKERS = min(os.cpu_count() or 1, 6)
+    # 页眉/页脚区域占页面高度的比例，完全落在该区域内的文本块视为页眉页脚
+    HEADER_FOOTER_MARGIN = 0.05
+    # 只需要纯文本的学科：版面分析对它们帮助不大，直接用PyMuPDF提取
+    TEXT_ONLY_SUBJECTS = frozenset({'语文', '数学', '英语'})
+    # 不超过该大小的PDF整体读入内存后再解析
+    STREAM_OPEN_MAX_BYTES = 200 * 1024 * 1024
+    # 提取逻辑变化导致旧缓存失效时递增
+    CACHE_VERSION = 2
+
     def __init__(self,
                  use_unstructured: bool = True,
                  extract_images: bool = True,
-                 preserve_layout: bool = True):
+                 preserve_layout: bool = True,
+                 cache_dir: Optional[str] = '.pdfcache'):
         """
         初始化PDF处理器
 
@@ -43,10 +156,12 @@ class PDFProcessor:
             use_unstructured: 是否使用unstructured库
             extract_images: 是否提取图片信息
             preserve_layout: 是否保持文档布局
+            cache_dir: 提取结果缓存目录，None表示不缓存
         """
         self.use_unstructured = use_unstructured and UNSTRUCTURED_AVAILABLE
         self.extract_images = extract_images
         self.preserve_layout = preserve_layout
+        self.cache_dir = Path(cache_dir) if cache_dir else None
 
         if not PYMUPDF_AVAILABLE and not self.use_unstructured:
             raise ImportError("需要安装PyMuPDF或unstructured库来处理PDF文件")
@@ -61,23 +176,32 @@ class PDFProcessor:
         Returns:
             包含提取结果的字典
         """
-        if not os.path.exists(pdf_path):
-            raise FileNotFoundError(f"PDF文件不存在: {pdf_path}")
+        # 一次stat同时完成存在性检查、文件大小获取和缓存键计算
+        try:
+            file_stat = os.stat(pdf_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"PDF文件不存在: {pdf_path}") from None
 
         try:
             logger.info(f"开始处理PDF: {pdf_path}")
 
             # 获取文件信息
             file_name = os.path.basename(pdf_path)
-            file_size = os.path.getsize(pdf_path)
+            file_size = file_stat.st_size
 
             # 提取教育元数据
             education_metadata = self._extract_education_metadata(file_name)
 
-            if self.use_unstructured:
-                result = self._extract_with_unstructured(pdf_path)
-            else:
-                result = self._extract_with_pymupdf(pdf_path)
+            # 使用哪种提取方式取决于文件名识别出的学科，需要计入缓存键
+            use_unstructured = self._should_use_unstructured(education_metadata)
+            cache_path = self._get_cache_path(pdf_path, file_stat, variant=education_metadata['subject'])
+            result = self._load_cached_result(cache_path)
+            if result is None:
+                if use_unstructured:
+                    result = self._extract_with_unstructured(pdf_path)
+                else:
+                    result = self._extract_with_pymupdf(pdf_path)
+                self._save_cached_result(cache_path, result)
 
             # 添加文件信息
             result.update({
@@ -86,7 +210,7 @@ class PDFProcessor:
                 'file_size': file_size,
                 'processed_date': datetime.now().isoformat(),
                 'education_metadata': education_metadata,
-                'processor_type': 'unstructured' if self.use_unstructured else 'pymupdf'
+                'processor_type': 'unstructured' if use_unstructured else 'pymupdf'
             })
 
             logger.info(f"PDF处理完成: {len(result.get('pages', []))} 页")
@@ -96,6 +220,116 @@ class PDFProcessor:
             logger.error(f"PDF处理失败: {e}")
             raise
 
+    def extract_batch(self, pdf_paths: List[str],
+                      max_workers: Optional[int] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        按文件并行处理多个PDF，按完成顺序产出 (文件路径, 提取结果)
+
+        PyMuPDF不支持多线程，所以按文件分给进程池而不是线程池；工作进程内逐页串行提取，
+        不再为单个文件另开逐页进程池，避免进程数成倍增加
+
+        Args:
+            pdf_paths: PDF文件路径列表
+            max_workers: 最大进程数，为空时使用MAX_WORKERS
+
+        Returns:
+            产出 (文件路径, 提取结果) 的迭代器；某个文件处理失败时抛出该文件的异常
+        """
+        max_workers = min(max_workers or self.MAX_WORKERS, len(pdf_paths))
+        if max_workers < 2:
+            for pdf_path in pdf_paths:
+                yield pdf_path, self.extract_text_from_pdf(pdf_path)
+            return
+
+        worker = copy.copy(self)
+        worker.MAX_WORKERS = 1
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(worker.extract_text_from_pdf, pdf_path): pdf_path
+                       for pdf_path in pdf_paths}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def _should_use_unstructured(self, education_metadata: Dict[str, str]) -> bool:
+        """
+        判断是否使用unstructured提取
+
+        unstructured的hi_res策略要跑版面分析模型，比PyMuPDF慢一个数量级；
+        只有需要保持版面、且学科不是纯文本学科时才值得使用
+        """
+        if not self.use_unstructured:
+            return False
+        if not PYMUPDF_AVAILABLE:
+            return True
+
+        subject = education_metadata.get('subject')
+        use_unstructured = self.preserve_layout and subject not in self.TEXT_ONLY_SUBJECTS
+        if not use_unstructured:
+            logger.info(f"学科为{subject}（保持版面: {self.preserve_layout}），使用PyMuPDF代替unstructured")
+        return use_unstructured
+
+    def _get_cache_path(self, pdf_path: str, file_stat: os.stat_result,
+                        variant: str = '') -> Optional[Path]:
+        """
+        按文件路径、修改时间、大小和处理器配置计算缓存文件路径
+
+        只用stat信息生成键，命中缓存时不必读取整个PDF计算内容哈希；
+        文件被替换或修改后修改时间和大小会变化，旧缓存自然失效
+
+        Args:
+            pdf_path: PDF文件路径
+            file_stat: PDF文件的os.stat结果
+            variant: 影响提取方式的附加条件（如按文件名识别出的学科）
+
+        Returns:
+            缓存文件路径，未启用缓存时返回None
+        """
+        if self.cache_dir is None:
+            return None
+
+        file_key = f"{os.path.abspath(pdf_path)}|{file_stat.st_mtime_ns}|{file_stat.st_size}"
+        file_hash = hashlib.blake2b(file_key.encode('utf-8'), digest_size=16).hexdigest()
+        config = (f"{type(self).__name__}_v{self.CACHE_VERSION}_"
+                  f"{int(self.use_unstructured)}{int(self.extract_images)}{int(self.preserve_layout)}")
+        if variant:
+            config += '_' + hashlib.blake2b(variant.encode('utf-8'), digest_size=4).hexdigest()
+        return self.cache_dir / f"{file_hash}_{config}.pkl"
+
+    def _load_cached_result(self, cache_path: Optional[Path]) -> Optional[Dict[str, Any]]:
+        """读取缓存的提取结果，未命中或读取失败时返回None"""
+        if cache_path is None or not cache_path.exists():
+            return None
+
+        try:
+            with open(cache_path, 'rb') as f:
+                result = pickle.load(f)
+            logger.info(f"命中PDF提取缓存: {cache_path.name}")
+            return result
+        except Exception as e:
+            logger.warning(f"读取PDF提取缓存失败，重新提取: {e}")
+            return None
+
+    def _save_cached_result(self, cache_path: Optional[Path], result: Dict[str, Any]):
+        """
+        保存提取结果到缓存，先写临时文件再替换，避免留下写了一半的缓存
+
+        临时文件名唯一，多个进程同时写同一缓存键时各写各的，最后一次替换生效
+        """
+        if cache_path is None:
+            return
+
+        tmp_path = None
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=cache_path.parent, prefix=cache_path.stem + '.',
+                                             suffix='.tmp', delete=False) as f:
+                tmp_path = Path(f.name)
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(cache_path)
+        except Exception as e:
+            logger.warning(f"保存PDF提取缓存失败: {e}")
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+
     def _extract_with_unstructured(self, pdf_path: str) -> Dict[str, Any]:
         """使用unstructured库提取PDF内容"""
         try:
@@ -112,8 +346,12 @@ class PDFProcessor:
             current_page_num = 1
 
             for element in elements:
-                # 获取页面信息
-                page_num = getattr(element, 'page_number', 1)
+                # 获取页面信息：unstructured把页码放在元素的metadata里，
+                # 没有页码的元素（如分页符）归入当前页
+                try:
+                    page_num = element.metadata.page_number or current_page_num
+                except AttributeError:
+                    page_num = current_page_num
 
                 # 如果是新页面，保存前一页内容
                 if page_num != current_page_num:
@@ -126,9 +364,13 @@ class PDFProcessor:
                     current_page = []
                     current_page_num = page_num
 
-                # 添加元素内容
-                if hasattr(element, 'text') and element.text.strip():
-                    current_page.append(element.text.strip())
+                # 添加元素内容（每个元素只strip一次）
+                try:
+                    text = element.text.strip()
+                except AttributeError:
+                    text = ''
+                if text:
+                    current_page.append(text)
 
             # 添加最后一页
             if current_page:
@@ -149,64 +391,212 @@ class PDFProcessor:
             logger.warning(f"unstructured解析失败，回退到PyMuPDF: {e}")
             return self._extract_with_pymupdf(pdf_path)
 
-    def _extract_with_pymupdf(self, pdf_path: str) -> Dict[str, Any]:
-        """使用PyMuPDF提取PDF内容"""
-        try:
-            doc = fitz.open(pdf_path)
-            pages = []
+    def _extract_with_pymupdf(self, pdf_path: str, chinese_mode: bool = False, doc=None) -> Dict[str, Any]:
+        """
+        使用PyMuPDF提取PDF内容
 
-            for page_num in range(len(doc)):
-                page = doc[page_num]
+        Args:
+            pdf_path: PDF文件路径
+            chinese_mode: 是否按语文教材预处理并识别页面结构，失败时回退到普通处理
+            doc: 已打开的fitz文档（回退重试时复用，避免重复读取和解析文件），为空时自行打开
+
+        Returns:
+            包含页面列表的提取结果
+        """
+        # 自行打开的文档由with负责关闭（包括异常路径），调用方传入的文档由调用方关闭
+        with nullcontext(doc) if doc is not None else _open_pdf(pdf_path, self.STREAM_OPEN_MAX_BYTES) as doc:
+            try:
+                pages = list(self._iter_pages_pymupdf(doc, pdf_path, chinese_mode))
 
-                # 提取文本
-                text = page.get_text()
+                return {
+                    'pages': pages,
+                    'total_pages': len(pages),
+                    'method': 'pymupdf_chinese' if chinese_mode else 'pymupdf'
+                }
 
-                # 如果需要，提取图片信息
-                images = []
-                if self.extract_images:
-                    image_list = page.get_images()
-                    for img_index, img in enumerate(image_list):
-                        try:
-                            # 获取图片信息
-                            xref = img[0]
-                            pix = fitz.Pixmap(doc, xref)
-
-                            if pix.width > 50 and pix.height > 50:  # 过滤小图片
-                                images.append({
-                                    'index': img_index,
-                                    'width': pix.width,
-                                    'height': pix.height,
-                                    'xref': xref
-                                })
-
-                            pix = None  # 释放内存
-                        except Exception as e:
-                            logger.debug(f"提取图片信息失败: {e}")
+            except Exception as e:
+                if not chinese_mode:
+                    logger.error(f"PyMuPDF解析失败: {e}")
+                    raise
+                logger.error(f"语文教材PyMuPDF解析失败: {e}")
+                # 回退到普通处理，复用已打开的文档
+                return self._extract_with_pymupdf(pdf_path, doc=doc)
+
+    def iter_pages(self, pdf_path: str,
+                   batch_size: Optional[int] = None) -> Iterator[Union[Dict[str, Any], List[Dict[str, Any]]]]:
+        """
+        用PyMuPDF流式提取页面，调用方边取边处理，不必把整本教材的页面都留在内存里
 
-                # 预处理文本
-                cleaned_text = self._preprocess_page_text(text)
+        Args:
+            pdf_path: PDF文件路径
+            batch_size: 每次产出的页数；为空时逐页产出页面字典，否则产出页面列表
 
-                if cleaned_text.strip():
-                    pages.append({
-                        'page_number': page_num + 1,
-                        'text': cleaned_text,
-                        'images': images,
-                        'raw_text_length': len(text),
-                        'cleaned_text_length': len(cleaned_text)
-                    })
+        Returns:
+            按页码顺序产出页面（或页面列表）的迭代器
+        """
+        with _open_pdf(pdf_path, self.STREAM_OPEN_MAX_BYTES) as doc:
+            pages = self._iter_pages_pymupdf(doc, pdf_path, self._is_chinese_textbook(pdf_path))
+            if not batch_size:
+                yield from pages
+                return
 
-            doc.close()
+            while batch := list(islice(pages, batch_size)):
+                yield batch
 
-            return {
-                'pages': pages,
-                'total_pages': len(pages),
-                'method': 'pymupdf'
-            }
+    def export_pages_jsonl(self, pdf_path: str, output_path: str) -> Dict[str, Any]:
+        """
+        边提取边把页面逐行写入JSONL文件，内存中只保留当前页，适合整本大教材的离线导出
 
-        except Exception as e:
-            logger.error(f"PyMuPDF解析失败: {e}")
+        先写临时文件再替换，提取中途失败不会留下不完整的输出
+
+        Args:
+            pdf_path: PDF文件路径
+            output_path: 输出的JSONL文件路径，每行一个页面字典
+
+        Returns:
+            汇总信息（页数、清理后字符数、输出路径）
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        total_pages = 0
+        total_chars = 0
+        # 临时文件名唯一，多个进程导出到同一路径时不会写进同一个临时文件
+        tmp_file = tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=output_path.parent,
+                                               prefix=output_path.name + '.', suffix='.tmp', delete=False)
+        tmp_path = Path(tmp_file.name)
+        try:
+            with tmp_file as f:
+                for page_info in self.iter_pages(pdf_path):
+                    f.write(json.dumps(page_info, ensure_ascii=False))
+                    f.write('\n')
+                    total_pages += 1
+                    total_chars += page_info['cleaned_text_length']
+            tmp_path.replace(output_path)
+        except Exception:
+            tmp_path.unlink(missing_ok=True)
             raise
 
+        logger.info(f"页面已导出到 {output_path}: {total_pages} 页")
+        return {
+            'total_pages': total_pages,
+            'total_chars': total_chars,
+            'output_path': str(output_path),
+            'method': 'pymupdf_chinese' if self._is_chinese_textbook(pdf_path) else 'pymupdf'
+        }
+
+    def _is_chinese_textbook(self, pdf_path: str) -> bool:
+        """是否按语文教材方式提取该PDF"""
+        return False
+
+    def _iter_pages_pymupdf(self, doc, pdf_path: str, chinese_mode: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        逐页提取PDF内容，页数较多时按连续页段分给进程池并行处理
+
+        串行时每次只提取一页；并行时按页段产出，页段内的页面由工作进程一次返回
+
+        Args:
+            doc: 已打开的fitz文档，由调用方负责关闭
+            pdf_path: PDF文件路径，并行时供工作进程各自打开文档
+            chinese_mode: 是否按语文教材预处理并识别页面结构
+
+        Returns:
+            按页码顺序产出页面字典的迭代器
+        """
+        extract_page = partial(self._extract_page, chinese_mode=chinese_mode)
+        page_count = len(doc)
+        if page_count < self.PARALLEL_MIN_PAGES or self.MAX_WORKERS < 2:
+            for page_number, page in enumerate(doc, start=1):
+                page_info = extract_page(page, page_number)
+                if page_info is not None:
+                    yield page_info
+            return
+
+        step = -(-page_count // self.MAX_WORKERS)
+        page_ranges = [range(start, min(start + step, page_count))
+                       for start in range(0, page_count, step)]
+        with ProcessPoolExecutor(max_workers=len(page_ranges)) as executor:
+            for pages in executor.map(_extract_pages_worker, repeat(pdf_path), page_ranges, repeat(extract_page)):
+                yield from pages
+
+    def _extract_page(self, page, page_number: int, chinese_mode: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        提取单页文本和图片信息，清理后为空的页面返回None
+
+        chinese_mode时使用语文教材专用预处理，并附加页面结构识别结果
+
+        Args:
+            page: PyMuPDF页面对象
+            page_number: 页码（从1开始）
+            chinese_mode: 是否按语文教材处理
+        """
+        # 提取文本
+        text = self._get_page_text(page)
+
+        # 预处理文本
+        if chinese_mode:
+            cleaned_text = self._preprocess_chinese_text(text)
+        else:
+            cleaned_text = self._preprocess_page_text(text)
+
+        # 两种预处理都返回strip后的文本，直接判空即可
+        if not cleaned_text:
+            return None
+
+        # 如果需要，提取图片信息
+        images = self._extract_page_images(page) if self.extract_images else []
+
+        page_info = {
+            'page_number': page_number,
+            'text': cleaned_text,
+            'images': images
+        }
+
+        if chinese_mode:
+            # 识别页面结构，有图片时更新结构信息
+            structure_info = self.detect_chinese_textbook_structure(cleaned_text)
+            if images:
+                structure_info['has_images'] = True
+            page_info['structure_info'] = structure_info
+
+        page_info['raw_text_length'] = len(text)
+        page_info['cleaned_text_length'] = len(cleaned_text)
+        return page_info
+
+    def _get_page_text(self, page) -> str:
+        """
+        按阅读顺序提取页面文本块，跳过页眉/页脚区域的块（页码、书名等）
+
+        文本块之间用空行分隔，块内仍保留原始换行，交给后续按行清理
+        """
+        height = page.rect.height
+        header_bottom = height * self.HEADER_FOOTER_MARGIN
+        footer_top = height - header_bottom
+        return '\n\n'.join(
+            block_text
+            for x0, y0, x1, y1, block_text, block_no, block_type in page.get_text("blocks", flags=_TEXT_FLAGS, sort=True)
+            if block_type == 0 and not (y1 <= header_bottom or y0 >= footer_top)
+        )
+
+    @staticmethod
+    def _extract_page_images(page) -> List[Dict[str, Any]]:
+        """
+        提取页面图片信息
+
+        宽高直接取自get_images()返回的图片字典（/Width、/Height），
+        不构造Pixmap，因此不会解码图片数据
+        """
+        images = []
+        for img_index, (xref, _smask, width, height, *_rest) in enumerate(page.get_images()):
+            if width > 50 and height > 50:  # 过滤小图片
+                images.append({
+                    'index': img_index,
+                    'width': width,
+                    'height': height,
+                    'xref': xref
+                })
+        return images
+
     def _extract_education_metadata(self, file_name: str) -> Dict[str, str]:
         """
         从文件名提取教育元数据
@@ -224,45 +614,19 @@ class PDFProcessor:
             'publisher': '人教版'
         }
 
-        file_name_lower = file_name.lower()
-
-        # 识别学科
-        if '数学' in file_name or 'math' in file_name_lower:
-            metadata['subject'] = '数学'
-        elif '语文' in file_name or 'chinese' in file_name_lower:
-            metadata['subject'] = '语文'
-        elif '英语' in file_name or 'english' in file_name_lower:
-            metadata['subject'] = '英语'
-        elif '科学' in file_name or 'science' in file_name_lower:
-            metadata['subject'] = '科学'
-
-        # 识别年级
-        if any(grade in file_name for grade in ['一年级', 'grade1', '1年级']):
-            metadata['grade'] = '一年级'
-        elif any(grade in file_name for grade in ['二年级', 'grade2', '2年级']):
-            metadata['grade'] = '二年级'
-        elif any(grade in file_name for grade in ['三年级', 'grade3', '3年级', '三上']):
-            metadata['grade'] = '三年级'
-        elif any(grade in file_name for grade in ['四年级', 'grade4', '4年级']):
-            metadata['grade'] = '四年级'
-        elif any(grade in file_name for grade in ['五年级', 'grade5', '5年级']):
-            metadata['grade'] = '五年级'
-        elif any(grade in file_name for grade in ['六年级', 'grade6', '6年级']):
-            metadata['grade'] = '六年级'
-
-        # 识别学期
-        if '上' in file_name or 'first' in file_name_lower:
-            metadata['semester'] = '上学期'
-        elif '下' in file_name or 'second' in file_name_lower:
-            metadata['semester'] = '下学期'
-
-        # 识别版本
-        if '人教' in file_name or 'pep' in file_name_lower:
-            metadata['publisher'] = '人教版'
-        elif '苏教' in file_name:
-            metadata['publisher'] = '苏教版'
-        elif '北师' in file_name:
-            metadata['publisher'] = '北师大版'
+        # 一次扫描找出命中的所有规则
+        matched = {
+            _EDUCATION_KEYWORD_RANKS[match.group(1).lower()]
+            for match in _RE_EDUCATION_KEYWORDS.finditer(file_name)
+        }
+
+        # 按优先级依次填充学科、年级、学期、版本，每个字段取优先级最高的命中
+        assigned = set()
+        for rank in sorted(matched):
+            field, value = _EDUCATION_KEYWORDS[rank][:2]
+            if field not in assigned:
+                assigned.add(field)
+                metadata[field] = value
 
         return metadata
 
@@ -279,33 +643,19 @@ class PDFProcessor:
         if not text:
             return text
 
-        # 移除多余空白
-        lines = text.split('\n')
-        cleaned_lines = []
-
-        for line in lines:
-            line = line.strip()
-
-            # 跳过明显无意义的行
-            if not line:
-                continue
-
-            # 跳过纯数字行（可能是页码）
-            if line.isdigit():
-                continue
-
-            # 跳过非常短的行（可能是页面标识）
-            if len(line) < 2:
-                continue
-
-            cleaned_lines.append(line)
+        # 去掉每行首尾空白；空行保留作为段落分隔，
+        # 跳过纯数字行（可能是页码）和非常短的行（可能是页面标识）
+        cleaned_lines = [
+            line for line in map(str.strip, text.split('\n'))
+            if not line or (len(line) >= 2 and not line.isdigit())
+        ]
 
         # 重新组合文本
         cleaned_text = '\n'.join(cleaned_lines)
 
-        # 规范化空白字符
-        cleaned_text = re.sub(r'\s+', ' ', cleaned_text)
-        cleaned_text = re.sub(r'\n\s*\n', '\n\n', cleaned_text)
+        # 规范化空白字符：先把连续空行合并为一个段落分隔，再合并行内空白（不动换行）
+        cleaned_text = _RE_BLANKLINE.sub('\n\n', cleaned_text)
+        cleaned_text = _RE_INLINE_WS.sub(' ', cleaned_text)
 
         return cleaned_text.strip()
 
@@ -315,6 +665,7 @@ class PDFProcessor:
             'use_unstructured': self.use_unstructured,
             'extract_images': self.extract_images,
             'preserve_layout': self.preserve_layout,
+            'cache_dir': str(self.cache_dir) if self.cache_dir else None,
             'pymupdf_available': PYMUPDF_AVAILABLE,
             'unstructured_available': UNSTRUCTURED_AVAILABLE
         }
@@ -326,7 +677,8 @@ class ChineseTextbookProcessor(PDFProcessor):
     def __init__(self,
                  use_unstructured: bool = True,
                  extract_images: bool = True,
-                 preserve_layout: bool = True):
+                 preserve_layout: bool = True,
+                 cache_dir: Optional[str] = '.pdfcache'):
         """
         初始化语文教材PDF处理器
 
@@ -334,15 +686,17 @@ class ChineseTextbookProcessor(PDFProcessor):
             use_unstructured: 是否使用unstructured库
             extract_images: 是否提取图片信息
             preserve_layout: 是否保持文档布局
+            cache_dir: 提取结果缓存目录，None表示不缓存
         """
         super().__init__(
             use_unstructured=use_unstructured,
             extract_images=extract_images,
-            preserve_layout=preserve_layout
+            preserve_layout=preserve_layout,
+            cache_dir=cache_dir
         )
 
         # 语文教材结构识别模式
-        self.chinese_patterns = {
+        self.chinese_patterns = {k: re.compile(v, re.MULTILINE) for k, v in {
             'lesson_title': r'^第?\s*[一二三四五六七八九十\d]+\s*课\s*[：《].*[》\s]*',
             'vocabulary': r'生字\s*词|生字\s*表|词语\s*盘点',
             'exercise': r'课后练习|练习\s*[一二三四五六七八九十\d]+|基础\s*练习',
@@ -352,7 +706,14 @@ class ChineseTextbookProcessor(PDFProcessor):
             'ancient_poem': r'古诗\s*[一二三四五六七八九十\d]+|日积月累',
             'pinyin': r'拼音乐园|拼音\s*复习',
             'character': r'识字\s*[一二三四五六七八九十\d]+|写字\s*指导'
-        }
+        }.items()}
+
+    def _match_structure_section(self, text: str) -> Optional[str]:
+        """按优先级返回文本命中的结构类型，未命中返回None"""
+        for name in _STRUCTURE_SECTIONS:
+            if self.chinese_patterns[name].search(text):
+                return name
+        return None
 
     def detect_chinese_textbook_structure(self, text: str) -> Dict[str, Any]:
         """
@@ -374,62 +735,26 @@ class ChineseTextbookProcessor(PDFProcessor):
             'has_images': False
         }
 
-        # 检测课文标题
-        lesson_match = re.search(self.chinese_patterns['lesson_title'], text, re.MULTILINE)
-        if lesson_match:
-            structure_info['content_type'] = '课文'
-            structure_info['section_type'] = 'lesson_title'
+        if len(text) < _MIN_STRUCTURE_TEXT_LENGTH:
+            return structure_info
+
+        section = self._match_structure_section(text)
+        if section is None:
+            return structure_info
+
+        content_type, language_focus, difficulty_level = _STRUCTURE_TYPES[section]
+        structure_info['content_type'] = content_type
+        structure_info['section_type'] = section
+        structure_info['language_focus'] = language_focus
+        structure_info['difficulty_level'] = difficulty_level
 
-            # 提取课号
-            lesson_number = re.search(r'第?\s*([一二三四五六七八九十\d]+)\s*课', lesson_match.group())
+        # 课文标题需要额外提取课号
+        if section == 'lesson_title':
+            lesson_match = self.chinese_patterns['lesson_title'].search(text)
+            lesson_number = _RE_LESSON_NUMBER.search(lesson_match.group())
             if lesson_number:
                 structure_info['lesson_number'] = lesson_number.group(1)
 
-            structure_info['language_focus'] = '阅读理解'
-            structure_info['difficulty_level'] = 2
-
-        # 检测生字词
-        elif re.search(self.chinese_patterns['vocabulary'], text):
-            structure_info['content_type'] = '生字词'
-            structure_info['section_type'] = 'vocabulary'
-            structure_info['language_focus'] = '识字'
-            structure_info['difficulty_level'] = 1
-
-        # 检测课后练习
-        elif re.search(self.chinese_patterns['exercise'], text):
-            structure_info['content_type'] = '练习题'
-            structure_info['section_type'] = 'exercise'
-            structure_info['language_focus'] = '理解应用'
-            structure_info['difficulty_level'] = 3
-
-        # 检测单元复习
-        elif re.search(self.chinese_patterns['unit_review'], text):
-            structure_info['content_type'] = '单元复习'
-            structure_info['section_type'] = 'unit_review'
-            structure_info['language_focus'] = '综合复习'
-            structure_info['difficulty_level'] = 2
-
-        # 检测习作
-        elif re.search(self.chinese_patterns['writing'], text):
-            structure_info['content_type'] = '写作指导'
-            structure_info['section_type'] = 'writing'
-            structure_info['language_focus'] = '写作'
-            structure_info['difficulty_level'] = 3
-
-        # 检测古诗
-        elif re.search(self.chinese_patterns['ancient_poem'], text):
-            structure_info['content_type'] = '古诗词'
-            structure_info['section_type'] = 'ancient_poem'
-            structure_info['language_focus'] = '古诗欣赏'
-            structure_info['difficulty_level'] = 2
-
-        # 检测识字内容
-        elif re.search(self.chinese_patterns['character'], text):
-            structure_info['content_type'] = '识字'
-            structure_info['section_type'] = 'character'
-            structure_info['language_focus'] = '识字'
-            structure_info['difficulty_level'] = 1
-
         return structure_info
 
     def _preprocess_chinese_text(self, text: str) -> str:
@@ -446,85 +771,21 @@ class ChineseTextbookProcessor(PDFProcessor):
             return text
 
         # 清理PDF解析产生的噪音
-        text = re.sub(r'\s+', ' ', text)  # 合并多余空白
-
-        # 保留中文字符、标点符号和常用符号
-        text = re.sub(r'[^\u4e00-\u9fff\u3000-\u303f\uff00-\uffef\s，。！？；：""''（）【】《》\\d一二三四五六七八九十]', '', text)
+        text = _RE_WS.sub(' ', text)  # 合并多余空白
 
-        # 确保标点符号格式统一
-        text = text.replace(',', '，').replace('.', '。').replace('!', '！').replace('?', '？')
-        text = text.replace(':', '：').replace(';', '；').replace('"', '"').replace('"', '"')
+        # 保留中文字符、标点符号和常用符号（半角的,.!?:;不在保留范围内，此处已被移除，
+        # 因此无需再做半角到全角标点的替换）
+        text = _RE_CHINESE_KEEP.sub('', text)
 
         # 清理页码等噪音
-        text = re.sub(r'\b\d+\s*页\b', '', text)  # 移除"X页"
-        text = re.sub(r'\b页\s*\d+\b', '', text)  # 移除"页X"
+        text = _RE_PAGE_NUM_A.sub('', text)  # 移除"X页"
+        text = _RE_PAGE_NUM_B.sub('', text)  # 移除"页X"
 
         return text.strip()
 
-    def _extract_with_pymupdf_chinese(self, pdf_path: str) -> Dict[str, Any]:
-        """使用PyMuPDF专门处理语文教材PDF"""
-        try:
-            doc = fitz.open(pdf_path)
-            pages = []
-
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-
-                # 获取页面文本
-                text = page.get_text()
-
-                # 语文教材专用预处理
-                cleaned_text = self._preprocess_chinese_text(text)
-
-                if cleaned_text.strip():
-                    # 识别页面结构
-                    structure_info = self.detect_chinese_textbook_structure(cleaned_text)
-
-                    # 获取图片信息
-                    images = []
-                    if self.extract_images:
-                        image_list = page.get_images()
-                        for img_index, img in enumerate(image_list):
-                            try:
-                                xref = img[0]
-                                pix = fitz.Pixmap(doc, xref)
-
-                                if pix.width > 50 and pix.height > 50:
-                                    images.append({
-                                        'index': img_index,
-                                        'width': pix.width,
-                                        'height': pix.height,
-                                        'xref': xref
-                                    })
-                                pix = None
-                            except Exception as e:
-                                logger.debug(f"提取图片信息失败: {e}")
-
-                    # 如果有图片，更新结构信息
-                    if images:
-                        structure_info['has_images'] = True
-
-                    pages.append({
-                        'page_number': page_num + 1,
-                        'text': cleaned_text,
-                        'images': images,
-                        'structure_info': structure_info,
-                        'raw_text_length': len(text),
-                        'cleaned_text_length': len(cleaned_text)
-                    })
-
-            doc.close()
-
-            return {
-                'pages': pages,
-                'total_pages': len(pages),
-                'method': 'pymupdf_chinese'
-            }
-
-        except Exception as e:
-            logger.error(f"语文教材PyMuPDF解析失败: {e}")
-            # 回退到普通处理
-            return self._extract_with_pymupdf(pdf_path)
+    def _is_chinese_textbook(self, pdf_path: str) -> bool:
+        """按文件名识别出的学科判断是否为语文教材"""
+        return self._extract_education_metadata(os.path.basename(pdf_path))['subject'] == '语文'
 
     def extract_text_from_pdf(self, pdf_path: str) -> Dict[str, Any]:
         """
@@ -536,42 +797,52 @@ class ChineseTextbookProcessor(PDFProcessor):
         Returns:
             包含提取结果的字典
         """
-        if not os.path.exists(pdf_path):
-            raise FileNotFoundError(f"PDF文件不存在: {pdf_path}")
+        # 一次stat同时完成存在性检查、文件大小获取和缓存键计算
+        try:
+            file_stat = os.stat(pdf_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"PDF文件不存在: {pdf_path}") from None
 
         try:
             logger.info(f"开始处理语文教材PDF: {pdf_path}")
 
             # 获取文件信息
             file_name = os.path.basename(pdf_path)
-            file_size = os.path.getsize(pdf_path)
+            file_size = file_stat.st_size
 
             # 提取教育元数据
             education_metadata = self._extract_education_metadata(file_name)
 
-            # 如果是语文教材，使用专用处理
-            if education_metadata.get('subject') == '语文':
-                logger.info("检测到语文教材，使用专用处理器")
-                if self.use_unstructured:
-                    # 尝试使用unstructured处理
-                    try:
-                        result = self._extract_with_unstructured(pdf_path)
-                        # 对结果进行结构识别
-                        for page in result['pages']:
-                            text = page.get('text', '')
-                            if text:
-                                page['structure_info'] = self.detect_chinese_textbook_structure(text)
-                    except Exception as e:
-                        logger.warning(f"unstructured处理语文教材失败，回退到专用PyMuPDF: {e}")
-                        result = self._extract_with_pymupdf_chinese(pdf_path)
-                else:
-                    result = self._extract_with_pymupdf_chinese(pdf_path)
-            else:
-                # 使用标准处理
-                if self.use_unstructured:
-                    result = self._extract_with_unstructured(pdf_path)
+            # 是否按语文教材处理取决于文件名识别出的学科，需要计入缓存键
+            cache_path = self._get_cache_path(pdf_path, file_stat, variant=education_metadata['subject'])
+            result = self._load_cached_result(cache_path)
+
+            if result is None:
+                use_unstructured = self._should_use_unstructured(education_metadata)
+                # 如果是语文教材，使用专用处理
+                if education_metadata.get('subject') == '语文':
+                    logger.info("检测到语文教材，使用专用处理器")
+                    if use_unstructured:
+                        # 尝试使用unstructured处理
+                        try:
+                            result = self._extract_with_unstructured(pdf_path)
+                            # 对结果进行结构识别
+                            for page in result['pages']:
+                                text = page.get('text', '')
+                                if text:
+                                    page['structure_info'] = self.detect_chinese_textbook_structure(text)
+                        except Exception as e:
+                            logger.warning(f"unstructured处理语文教材失败，回退到专用PyMuPDF: {e}")
+                            result = self._extract_with_pymupdf(pdf_path, chinese_mode=True)
+                    else:
+                        result = self._extract_with_pymupdf(pdf_path, chinese_mode=True)
                 else:
-                    result = self._extract_with_pymupdf(pdf_path)
+                    # 使用标准处理
+                    if use_unstructured:
+                        result = self._extract_with_unstructured(pdf_path)
+                    else:
+                        result = self._extract_with_pymupdf(pdf_path)
+                self._save_cached_result(cache_path, result)
 
             # 添加文件信息
             result.update({
@@ -594,7 +865,8 @@ class ChineseTextbookProcessor(PDFProcessor):
 def create_pdf_processor(use_unstructured: bool = True,
                         extract_images: bool = True,
                         preserve_layout: bool = True,
-                        subject: str = None) -> PDFProcessor:
+                        subject: str = None,
+                        cache_dir: Optional[str] = '.pdfcache') -> PDFProcessor:
     """
     创建PDF处理器的工厂函数
 
@@ -603,6 +875,7 @@ def create_pdf_processor(use_unstructured: bool = True,
         extract_images: 是否提取图片信息
         preserve_layout: 是否保持文档布局
         subject: 学科类型，如果是'语文'则使用专用处理器
+        cache_dir: 提取结果缓存目录，None表示不缓存
 
     Returns:
         PDF处理器实例
@@ -611,13 +884,15 @@ def create_pdf_processor(use_unstructured: bool = True,
         return ChineseTextbookProcessor(
             use_unstructured=use_unstructured,
             extract_images=extract_images,
-            preserve_layout=preserve_layout
+            preserve_layout=preserve_layout,
+            cache_dir=cache_dir
         )
     else:
         return PDFProcessor(
             use_unstructured=use_unstructured,
             extract_images=extract_images,
-            preserve_layout=preserve_layout
+            preserve_layout=preserve_layout,
+            cache_dir=cache_dir
         )
 
 
@@ -5,6 +5,7 @@ RAG Retrieval Service for Homework Pal
 实现基于向量相似性的语义搜索功能，支持人教版教材内容检索
 """
 
+import json
 import logging
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
@@ -84,7 +85,7 @@ class RAGService:
             subject: 学科过滤 (如: 数学, 语文, 英语)
             grade: 年级过滤 (如: 三年级)
             unit: 单元过滤
-            filters: 其他过滤条件
+            filters: 其他过滤条件，字符串值按文本等值匹配，列表值按IN匹配
 
         Returns:
             检索结果列表，按相似度降序排列
@@ -156,7 +157,7 @@ class RAGService:
             subject: 学科过滤
             grade: 年级过滤
             unit: 单元过滤
-            additional_filters: 其他过滤条件
+            additional_filters: 其他过滤条件，字符串值按文本等值匹配，列表值按IN匹配
 
         Returns:
             检索结果列表
@@ -188,17 +189,18 @@ class RAGService:
             if subject or grade or unit or additional_filters:
                 filter_conditions = []
 
+                # subject/grade/unit在元数据中总是字符串，合并为一个JSONB包含查询，可使用metadata_json的GIN索引；
+                # 其他键（如page_number、lesson_number）可能以JSON数字存储，@>要求类型一致，
+                # 因此仍按 ->> 取文本比较，保持 filters={'lesson_number': '3'} 这类调用的原有行为
+                metadata_filter = {}
                 if subject:
-                    filter_conditions.append("metadata_json->>'subject' = :subject")
-                    params['subject'] = subject
+                    metadata_filter['subject'] = subject
 
                 if grade:
-                    filter_conditions.append("metadata_json->>'grade' = :grade")
-                    params['grade'] = grade
+                    metadata_filter['grade'] = grade
 
                 if unit:
-                    filter_conditions.append("metadata_json->>'unit' = :unit")
-                    params['unit'] = unit
+                    metadata_filter['unit'] = unit
 
                 # 添加其他过滤条件
                 if additional_filters:
@@ -213,6 +215,10 @@ class RAGService:
                             for i, v in enumerate(value):
                                 params[f'filter_{key}_{i}'] = v
 
+                if metadata_filter:
+                    filter_conditions.append("metadata_json @> CAST(:metadata_filter AS jsonb)")
+                    params['metadata_filter'] = json.dumps(metadata_filter, ensure_ascii=False)
+
                 if filter_conditions:
                     base_sql += " AND " + " AND ".join(filter_conditions)
 
@@ -322,14 +328,14 @@ class RAGService:
 
             # 添加过滤条件 (与向量搜索相同的逻辑)
             if any(filters.values()):
-                filter_conditions = []
-                for key, value in filters.items():
-                    if value and key in ['subject', 'grade', 'unit']:
-                        filter_conditions.append(f"metadata_json->>'{key}' = :{key}")
-                        params[key] = value
-
-                if filter_conditions:
-                    base_sql += " AND " + " AND ".join(filter_conditions)
+                metadata_filter = {
+                    key: value for key, value in filters.items()
+                    if value and key in ['subject', 'grade', 'unit']
+                }
+
+                if metadata_filter:
+                    base_sql += " AND metadata_json @> CAST(:metadata_filter AS jsonb)"
+                    params['metadata_filter'] = json.dumps(metadata_filter, ensure_ascii=False)
 
             # 添加排序和限制
             base_sql += " ORDER BY keyword_score DESC LIMIT :limit"
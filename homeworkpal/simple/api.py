@@ -3,14 +3,14 @@ Homework Pal FastAPI Backend (Simplified Version)
 提供基础的后端服务，暂时忽略数据库连接
 """
 
-from fastapi import FastAPI, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import HTTPException
 from pydantic import BaseModel, Field
 from typing import Optional, List, Dict, Any
 import uvicorn
 import os
 
 from homeworkpal.core.config import settings
+from homeworkpal.api.app_factory import create_app
 from homeworkpal.utils.logger import get_simple_logger
 from homeworkpal.rag.qa_service import QAService, QARequest, QAResponse
 
@@ -20,27 +20,13 @@ logger = get_simple_logger()
 # Initialize QA service
 qa_service = QAService()
 
-app = FastAPI(
-    title=settings.APP_NAME,
-    description="AI-powered homework assistant backend",
-    version=settings.VERSION,
-    debug=settings.DEBUG
-)
+app = create_app(title=settings.APP_NAME, version=settings.VERSION, debug=settings.DEBUG)
 
 @app.on_event("startup")
 async def startup_event():
     """Log application startup."""
     logger.info(f"Starting {settings.APP_NAME} v{settings.VERSION} on port {settings.PORT}")
 
-# Configure CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
 class HealthResponse(BaseModel):
     status: str
     message: str
@@ -27,10 +27,13 @@ from homeworkpal.database.models import TextbookChunk
 from sqlalchemy.orm import sessionmaker
 from simple_text_splitter import create_simple_splitter
 
+# 状态图标
+_STATUS_ICONS = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾"}
+
+
 def print_status(message: str, status: str):
     """打印状态信息"""
-    icons = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾"}
-    print(f"{icons.get(status, 'ℹ️')} {message}")
+    print(f"{_STATUS_ICONS.get(status, 'ℹ️')} {message}")
 
 
 def process_textbook_documents_simple(data_dir: str) -> List[Dict[str, Any]]:
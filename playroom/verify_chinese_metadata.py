@@ -20,10 +20,13 @@ from sqlalchemy.orm import sessionmaker
 from homeworkpal.database.models import TextbookChunk
 import json
 
+# 状态图标
+_STATUS_ICONS = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾", "📖": "📖"}
+
+
 def print_status(message: str, status: str):
     """打印状态信息"""
-    icons = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾", "📖": "📖"}
-    print(f"{icons.get(status, 'ℹ️')} {message}")
+    print(f"{_STATUS_ICONS.get(status, 'ℹ️')} {message}")
 
 
 def verify_metadata_structure():
@@ -13,10 +13,13 @@ import importlib
 from pathlib import Path
 
 
+# 状态图标
+_STATUS_ICONS = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧"}
+
+
 def print_status(message: str, status: str):
     """打印状态信息"""
-    icons = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧"}
-    print(f"{icons.get(status, 'ℹ️')} {message}")
+    print(f"{_STATUS_ICONS.get(status, 'ℹ️')} {message}")
 
 
 def check_python_version():
@@ -0,0 +1,78 @@
+"""
+中文文本处理器测试
+Chinese Text Processor Tests
+
+测试批量向量化返回的向量矩阵形状、类型以及被过滤片段的零向量，以及质量评估中的编号行识别
+"""
+
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from homeworkpal.document.chinese_text_processor import ChineseTextProcessor
+from homeworkpal.llm.siliconflow import SiliconFlowEmbeddingModel
+
+
+class TestBatchVectorize:
+    """批量向量化测试类"""
+
+    @pytest.fixture
+    def processor(self):
+        """模拟向量化模型：每个文本的向量值等于其长度，便于核对回填位置"""
+        mock_model = Mock(spec=SiliconFlowEmbeddingModel)
+        mock_model.embed_documents.side_effect = lambda batch: [
+            [float(len(text))] * ChineseTextProcessor.EMBEDDING_DIMENSION for text in batch
+        ]
+        processor = ChineseTextProcessor(mock_model)
+        processor.MIN_REQUEST_INTERVAL = 0
+        return processor
+
+    def test_returns_float32_matrix(self, processor):
+        """返回 (片段数, 1024) 的float32矩阵，被过滤的片段对应行为零向量"""
+        texts = [
+            '《秋天》秋天来了，树叶黄了，一片片叶子从树上落下来。小朋友们在树下捡起落叶，做成了美丽的书签，送给老师和同学。',
+            '',
+            '《春天》春天到了，小草从地下探出头来，柳树抽出了嫩绿的枝条，燕子从南方飞回来了，田野里到处是忙着播种的农民。',
+        ]
+
+        embeddings, quality_results = processor.batch_vectorize_with_quality_control(texts, batch_size=1)
+
+        assert isinstance(embeddings, np.ndarray)
+        assert embeddings.dtype == np.float32
+        assert embeddings.shape == (len(texts), ChineseTextProcessor.EMBEDDING_DIMENSION)
+        assert len(quality_results) == len(texts)
+        assert not quality_results[1]['is_suitable']
+
+        # 被过滤的片段保持零向量，其余片段按原始序号回填
+        assert not embeddings[1].any()
+        assert embeddings[0].all() and embeddings[2].all()
+        assert embeddings[0, 0] != embeddings[2, 0]
+
+    def test_failed_batch_rows_stay_zero(self, processor):
+        """向量化失败的批次对应行保持零向量"""
+        processor.embedding_model.embed_documents.side_effect = RuntimeError('API不可用')
+        texts = ['《秋天》秋天来了，树叶黄了，一片片叶子从树上落下来。小朋友们在树下捡起落叶，做成了美丽的书签，送给老师和同学。']
+
+        embeddings, quality_results = processor.batch_vectorize_with_quality_control(texts, max_retries=1)
+
+        assert quality_results[0]['is_suitable']
+        assert embeddings.shape == (1, ChineseTextProcessor.EMBEDDING_DIMENSION)
+        assert not embeddings.any()
+
+    def test_empty_input(self, processor):
+        """没有片段时返回0行矩阵"""
+        embeddings, quality_results = processor.batch_vectorize_with_quality_control([])
+
+        assert embeddings.shape == (0, ChineseTextProcessor.EMBEDDING_DIMENSION)
+        assert quality_results == []
+
+    def test_numbered_lines_scored_on_raw_text(self, processor):
+        """编号行在原始文本上识别：预处理合并换行后仍能得到编号加分"""
+        raw = '秋天来了，树叶黄了，一片片叶子从树上落下来。\n1、读一读，说说秋天的景色。\n2、找出描写秋天颜色的句子。'
+        processed = processor.preprocess_chinese_text_for_embedding(raw)
+
+        _, quality_results = processor.batch_vectorize_with_quality_control([raw])
+
+        without_raw = processor.assess_embedding_quality(processed)['score']
+        assert quality_results[0]['score'] == pytest.approx(without_raw + 0.1)
@@ -0,0 +1,58 @@
+"""
+语文教材分析器测试
+Chinese Textbook Analyzer Tests
+
+测试教材结构分析结果缓存的命中与隔离
+"""
+
+import pytest
+
+from homeworkpal.document.chinese_textbook_analyzer import ChineseTextbookAnalyzer
+
+# 两段内容开头相同、长度相同，只有课文标题不同
+_PREFIX = '这是第二单元的课文内容，同学们认真阅读下面的文章，然后完成练习题目。好的好的'
+
+
+class TestStructureCache:
+    """教材结构缓存测试类"""
+
+    @pytest.fixture
+    def analyzer(self):
+        """语文教材分析器"""
+        return ChineseTextbookAnalyzer()
+
+    @pytest.fixture
+    def autumn_chunks(self):
+        """包含《秋天的雨》的片段"""
+        return [{'page_number': 13, 'chunk_id': 1, 'content': _PREFIX + '秋天的雨，有一把钥匙。'}]
+
+    def test_different_content_misses_cache(self, analyzer, autumn_chunks):
+        """内容不同的片段不会命中其他输入的缓存结果"""
+        other_chunks = [{'page_number': 13, 'chunk_id': 1, 'content': _PREFIX + '听听秋的声音，秋天来了'}]
+        assert len(other_chunks[0]['content']) == len(autumn_chunks[0]['content'])
+
+        expected = [lesson.lesson_title for lesson in ChineseTextbookAnalyzer().analyze_textbook_structure(other_chunks).units]
+
+        assert [lesson.lesson_title for lesson in analyzer.analyze_textbook_structure(autumn_chunks).units] == ['秋天的雨']
+        assert [lesson.lesson_title for lesson in analyzer.analyze_textbook_structure(other_chunks).units] == expected
+
+    def test_cache_hit_returns_independent_copy(self, analyzer, autumn_chunks):
+        """修改返回的结构不会影响之后命中缓存的结果"""
+        first = analyzer.analyze_textbook_structure(autumn_chunks)
+        first.units[0].lesson_title = '已修改'
+        first.units.clear()
+
+        second = analyzer.analyze_textbook_structure(autumn_chunks)
+        second.units[0].content_chunks.clear()
+
+        third = analyzer.analyze_textbook_structure(autumn_chunks)
+        assert [lesson.lesson_title for lesson in third.units] == ['秋天的雨']
+        assert third.units[0].content_chunks
+        assert third is not second
+
+    def test_cache_is_bounded(self, analyzer, autumn_chunks):
+        """缓存条目数不超过上限"""
+        for i in range(ChineseTextbookAnalyzer.STRUCTURE_CACHE_SIZE + 3):
+            analyzer.analyze_textbook_structure([{**autumn_chunks[0], 'chunk_id': i}])
+
+        assert len(analyzer._structure_cache) == ChineseTextbookAnalyzer.STRUCTURE_CACHE_SIZE
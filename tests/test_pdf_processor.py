@@ -0,0 +1,171 @@
+"""
+PDF处理器测试
+PDF Processor Tests
+
+测试PDF提取结果缓存的命中、失效和写入，页眉页脚过滤，多进程逐页提取，以及语文教材结构识别
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+import pytest
+
+from homeworkpal.document.pdf_processor import ChineseTextbookProcessor, PDFProcessor, PYMUPDF_AVAILABLE
+
+if PYMUPDF_AVAILABLE:
+    import fitz
+
+pytestmark = pytest.mark.skipif(not PYMUPDF_AVAILABLE, reason="需要PyMuPDF")
+
+
+def make_pdf(path, page_texts):
+    """生成每页包含给定文本行的测试PDF"""
+    doc = fitz.open()
+    for lines in page_texts:
+        page = doc.new_page()
+        y = 100
+        for line in lines:
+            page.insert_text((72, y), line, fontname="china-s", fontsize=11)
+            y += 20
+    doc.save(str(path))
+    doc.close()
+
+
+class TestPDFExtractionCache:
+    """PDF提取结果缓存测试类"""
+
+    @pytest.fixture
+    def pdf_path(self, tmp_path):
+        """示例数学教材PDF"""
+        path = tmp_path / "数学三上.pdf"
+        make_pdf(path, [["第一单元 时、分、秒", "1分钟等于60秒"], ["第二单元 万以内的加法和减法"]])
+        return path
+
+    @pytest.fixture
+    def processor(self, tmp_path):
+        """使用临时缓存目录的处理器"""
+        return PDFProcessor(use_unstructured=False, cache_dir=str(tmp_path / "cache"))
+
+    def test_cache_round_trip(self, processor, pdf_path, tmp_path):
+        """第二次提取命中缓存，不再解析PDF"""
+        first = processor.extract_text_from_pdf(str(pdf_path))
+
+        cache_files = list((tmp_path / "cache").iterdir())
+        assert len(cache_files) == 1
+        assert cache_files[0].suffix == '.pkl'
+
+        with patch.object(PDFProcessor, '_extract_with_pymupdf', side_effect=AssertionError("不应重新解析")):
+            second = processor.extract_text_from_pdf(str(pdf_path))
+
+        assert second['pages'] == first['pages']
+        assert second['total_pages'] == 2
+
+    def test_cache_invalidated_by_mtime(self, processor, pdf_path, tmp_path):
+        """文件修改时间变化后缓存失效，重新提取"""
+        processor.extract_text_from_pdf(str(pdf_path))
+
+        stat = os.stat(pdf_path)
+        os.utime(pdf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        with patch.object(PDFProcessor, '_extract_with_pymupdf',
+                          wraps=processor._extract_with_pymupdf) as extract:
+            processor.extract_text_from_pdf(str(pdf_path))
+        extract.assert_called_once()
+        assert len(list((tmp_path / "cache").iterdir())) == 2
+
+    def test_cache_invalidated_by_content_change(self, processor, pdf_path):
+        """文件被替换（大小变化）后返回新内容"""
+        processor.extract_text_from_pdf(str(pdf_path))
+
+        make_pdf(pdf_path, [["第三单元 测量"], ["毫米、分米的认识"], ["千米的认识"]])
+        result = processor.extract_text_from_pdf(str(pdf_path))
+
+        assert result['total_pages'] == 3
+        assert '测量' in result['pages'][0]['text']
+
+    def test_cache_write_leaves_no_temp_files(self, processor, pdf_path, tmp_path):
+        """缓存写入后目录中只有缓存文件，没有残留的临时文件"""
+        processor.extract_text_from_pdf(str(pdf_path))
+
+        names = [path.name for path in (tmp_path / "cache").iterdir()]
+        assert len(names) == 1
+        assert not any(name.endswith('.tmp') for name in names)
+
+    def test_cache_disabled(self, pdf_path):
+        """cache_dir为None时不写缓存"""
+        processor = PDFProcessor(use_unstructured=False, cache_dir=None)
+
+        assert processor._get_cache_path(str(pdf_path), os.stat(pdf_path)) is None
+        assert processor.extract_text_from_pdf(str(pdf_path))['total_pages'] == 2
+
+
+class TestPyMuPDFPageText:
+    """PyMuPDF页面文本提取测试类"""
+
+    def test_header_footer_blocks_dropped(self, tmp_path):
+        """页眉/页脚区域的文本块被丢弃，正文按阅读顺序排列"""
+        path = tmp_path / "sample.pdf"
+        doc = fitz.open()
+        page = doc.new_page()  # A4: 595 x 842，页眉页脚区域各约42pt
+        page.insert_text((72, 30), "数学三年级上册", fontname="china-s", fontsize=9)
+        # 先写下方的段落，验证按位置而不是写入顺序排序
+        page.insert_text((72, 400), "第二段：正方形的周长", fontname="china-s", fontsize=11)
+        page.insert_text((72, 200), "第一段：长方形的周长", fontname="china-s", fontsize=11)
+        page.insert_text((72, 830), "人民教育出版社", fontname="china-s", fontsize=9)
+        doc.save(str(path))
+        doc.close()
+
+        processor = PDFProcessor(use_unstructured=False, cache_dir=None)
+        text = processor.extract_text_from_pdf(str(path))['pages'][0]['text']
+
+        assert "数学三年级上册" not in text
+        assert "人民教育出版社" not in text
+        assert text.index("第一段") < text.index("第二段")
+
+
+class TestParallelExtraction:
+    """多进程逐页提取测试类"""
+
+    def test_parallel_matches_sequential(self, tmp_path):
+        """进程池提取与串行提取结果一致，页面按页码顺序排列"""
+        path = tmp_path / "sample.pdf"
+        # 第4、8页为空白页，提取结果中应被跳过
+        make_pdf(path, [[] if i in (3, 7) else [f"第{i + 1}页 练习题{i + 1}"] for i in range(12)])
+
+        sequential = PDFProcessor(use_unstructured=False, cache_dir=None)
+        sequential.MAX_WORKERS = 1
+        parallel = PDFProcessor(use_unstructured=False, cache_dir=None)
+        parallel.MAX_WORKERS = 3
+        parallel.PARALLEL_MIN_PAGES = 2
+
+        expected = sequential.extract_text_from_pdf(str(path))['pages']
+        with patch('homeworkpal.document.pdf_processor.ProcessPoolExecutor',
+                   wraps=ProcessPoolExecutor) as pool:
+            pages = parallel.extract_text_from_pdf(str(path))['pages']
+
+        pool.assert_called_once_with(max_workers=3)
+        assert pages == expected
+        assert [page['page_number'] for page in pages] == [1, 2, 3, 5, 6, 7, 9, 10, 11, 12]
+
+
+class TestChineseTextbookStructure:
+    """语文教材结构识别测试类"""
+
+    @pytest.fixture
+    def processor(self):
+        return ChineseTextbookProcessor(use_unstructured=False, cache_dir=None)
+
+    def test_lesson_title_takes_priority(self, processor):
+        """同时命中多个模式时按优先级返回课文标题"""
+        text = "第3课《秋天的雨》\n生字表\n课后练习"
+        info = processor.detect_chinese_textbook_structure(text)
+
+        assert info['section_type'] == 'lesson_title'
+        assert info['content_type'] == '课文'
+
+    def test_lower_priority_sections(self, processor):
+        """未出现课文标题时返回下一个命中的结构类型"""
+        assert processor._match_structure_section("本课生字表，写字指导") == 'vocabulary'
+        assert processor._match_structure_section("语文园地四 日积月累") == 'unit_review'
+        assert processor._match_structure_section("秋天来了，树叶黄了") is None
@@ -5,6 +5,7 @@ RAG Service Tests
 测试RAG检索服务的语义搜索、向量检索和混合搜索功能
 """
 
+import json
 import pytest
 import logging
 from typing import List
@@ -126,7 +127,7 @@ class TestRAGService:
     def test_search_with_filters(self, mock_get_db, rag_service, sample_textbook_chunks):
         """测试带过滤条件的语义搜索"""
         mock_db = Mock()
-        mock_get_db.return_value = mock_db
+        mock_get_db.return_value = iter([mock_db])
 
         mock_result = Mock()
         mock_result.__iter__ = Mock(return_value=iter([
@@ -147,6 +148,7 @@ class TestRAGService:
             subject="数学",
             grade="三年级",
             unit="第一单元",
+            filters={'content_type': '课文', 'lesson_number': '3', 'page': ['15', '16']},
             top_k=3
         )
 
@@ -154,6 +156,25 @@ class TestRAGService:
         assert len(results) == 1
         assert results[0].content == sample_textbook_chunks[1]['content']
 
+        # subject/grade/unit合并为一个JSONB包含查询；其他键可能以数字存储，仍按 ->> 文本比较
+        sql, params = mock_db.execute.call_args[0]
+        sql = str(sql)
+        assert "metadata_json @> CAST(:metadata_filter AS jsonb)" in sql
+        assert "metadata_json->>'content_type' = :filter_content_type" in sql
+        assert "metadata_json->>'lesson_number' = :filter_lesson_number" in sql
+        assert "metadata_json->>'page' IN (:filter_page_0,:filter_page_1)" in sql
+        assert "metadata_json->>'subject'" not in sql
+        assert json.loads(params['metadata_filter']) == {
+            'subject': '数学',
+            'grade': '三年级',
+            'unit': '第一单元'
+        }
+        assert params['filter_content_type'] == '课文'
+        assert params['filter_lesson_number'] == '3'
+        assert '数学' in params['metadata_filter']  # 中文不转义，与库中存储一致
+        assert params['filter_page_0'] == '15'
+        assert params['filter_page_1'] == '16'
+
     @patch('homeworkpal.rag.rag_service.get_db')
     def test_search_no_results(self, mock_get_db, rag_service):
         """测试无结果情况"""
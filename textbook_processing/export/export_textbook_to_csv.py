@@ -9,6 +9,7 @@ Export Textbook PDF Data to CSV Script
 import sys
 import os
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import re
 from typing import List, Dict, Any
@@ -24,10 +25,56 @@ from homeworkpal.document.chinese_textbook_analyzer import ChineseTextbookAnalyz
 from homeworkpal.llm.siliconflow import SiliconFlowEmbeddingModel
 
 
+# 状态图标
+_STATUS_ICONS = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾", "🚀": "🚀", "📖": "📖"}
+
+
 def print_status(message: str, status: str):
     """打印状态信息"""
-    icons = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾", "🚀": "🚀", "📖": "📖"}
-    print(f"{icons.get(status, 'ℹ️')} {message}")
+    print(f"{_STATUS_ICONS.get(status, 'ℹ️')} {message}")
+
+
+# 片段基础列
+CHUNK_COLUMNS = ['chunk_id', 'page_number', 'chunk_index', 'content', 'content_length', 'source_file']
+
+# 课文结构列及对应的 LessonInfo 属性
+LESSON_COLUMNS = {
+    'unit_number': 'unit_number',
+    'unit_title': 'unit_title',
+    'lesson_number': 'lesson_number',
+    'lesson_title': 'lesson_title',
+    'lesson_start_page': 'start_page',
+    'lesson_end_page': 'end_page',
+}
+
+
+def assign_lessons_to_chunks(df: pd.DataFrame, lessons: List[Any]):
+    """
+    按页码为所有片段批量匹配课文
+
+    对每个片段取课文列表中第一个页码范围包含其页码的课文，
+    用一次NumPy广播比较代替逐片段扫描课文列表。
+
+    Args:
+        df: 片段DataFrame（需包含page_number列）
+        lessons: 课文信息列表
+    """
+    if not lessons or df.empty:
+        for col in LESSON_COLUMNS:
+            df[col] = None
+        return
+
+    pages = df['page_number'].to_numpy()[:, None]
+    starts = np.array([lesson.start_page for lesson in lessons])
+    ends = np.array([lesson.end_page or 999 for lesson in lessons])
+
+    in_range = (starts <= pages) & (pages <= ends)
+    matched = in_range.any(axis=1)
+    first_match = in_range.argmax(axis=1)
+
+    for col, attr in LESSON_COLUMNS.items():
+        values = np.array([getattr(lesson, attr) for lesson in lessons], dtype=object)
+        df[col] = pd.Series(np.where(matched, values[first_match], None).tolist(), index=df.index)
 
 
 def extract_textbook_content_to_csv(pdf_path: str, output_csv: str = "textbook_content.csv"):
@@ -117,6 +164,9 @@ def extract_textbook_content_to_csv(pdf_path: str, output_csv: str = "textbook_c
     # 分析器也需要修改以避免API调用
     analyzer = ChineseTextbookAnalyzer()
 
+    # 片段数据统一转为DataFrame，后续按列批量填充课文结构
+    df = pd.DataFrame(processed_chunks, columns=CHUNK_COLUMNS)
+
     try:
         # 使用分析器进行结构分析
         structure = analyzer.analyze_textbook_structure(processed_chunks)
@@ -128,60 +178,18 @@ def extract_textbook_content_to_csv(pdf_path: str, output_csv: str = "textbook_c
         print(f"  课文数: {structure.total_lessons}")
 
         # 6. 将片段与课文结构关联
-        chunk_with_structure = []
-        for chunk in processed_chunks:
-            # 查找对应的课文
-            matched_lesson = None
-            for lesson in structure.units:
-                if (lesson.start_page <= chunk['page_number'] <= (lesson.end_page or 999)):
-                    matched_lesson = lesson
-                    break
-
-            chunk_info = chunk.copy()
-            if matched_lesson:
-                chunk_info.update({
-                    'unit_number': matched_lesson.unit_number,
-                    'unit_title': matched_lesson.unit_title,
-                    'lesson_number': matched_lesson.lesson_number,
-                    'lesson_title': matched_lesson.lesson_title,
-                    'lesson_start_page': matched_lesson.start_page,
-                    'lesson_end_page': matched_lesson.end_page
-                })
-            else:
-                chunk_info.update({
-                    'unit_number': None,
-                    'unit_title': None,
-                    'lesson_number': None,
-                    'lesson_title': None,
-                    'lesson_start_page': None,
-                    'lesson_end_page': None
-                })
-
-            # 添加文本质量评估
-            chunk_info['text_quality'] = assess_text_quality(chunk_info['content'])
-
-            chunk_with_structure.append(chunk_info)
+        assign_lessons_to_chunks(df, structure.units)
 
     except Exception as e:
         print_status(f"结构分析失败，使用基础数据: {e}", "⚠️")
-        chunk_with_structure = []
-        for chunk in processed_chunks:
-            chunk_info = chunk.copy()
-            chunk_info.update({
-                'unit_number': None,
-                'unit_title': None,
-                'lesson_number': None,
-                'lesson_title': None,
-                'lesson_start_page': None,
-                'lesson_end_page': None,
-                'text_quality': assess_text_quality(chunk_info['content'])
-            })
-            chunk_with_structure.append(chunk_info)
+        for col in LESSON_COLUMNS:
+            df[col] = None
 
-    # 7. 转换为DataFrame并保存
-    print_status("创建CSV数据文件", "💾")
+    # 添加文本质量评估
+    df['text_quality'] = df['content'].map(assess_text_quality)
 
-    df = pd.DataFrame(chunk_with_structure)
+    # 7. 整理DataFrame并保存
+    print_status("创建CSV数据文件", "💾")
 
     # 重新排列列顺序
     column_order = [
@@ -22,16 +22,43 @@ sys.path.insert(0, str(project_root))
 from dotenv import load_dotenv
 load_dotenv()
 
-from homeworkpal.database.connection import engine
+from homeworkpal.database.connection import engine, bulk_insert_chunks
 from sqlalchemy.orm import sessionmaker
 from homeworkpal.database.models import TextbookChunk
 from homeworkpal.llm.base import BaseEmbeddingModel
 from homeworkpal.llm.siliconflow import SiliconFlowEmbeddingModel
 
+# 状态图标
+_STATUS_ICONS = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾", "📖": "📖"}
+
+# 每批写入数据库的片段数
+IMPORT_BATCH_SIZE = 100
+
+# embedding列的向量维度
+EMBEDDING_DIMENSION = TextbookChunk.embedding.type.dim
+
+
 def print_status(message: str, status: str):
     """打印状态信息"""
-    icons = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾", "📖": "📖"}
-    print(f"{icons.get(status, 'ℹ️')} {message}")
+    print(f"{_STATUS_ICONS.get(status, 'ℹ️')} {message}")
+
+
+# 导入时需要读取的CSV列（content_category为可选列）
+CSV_COLUMNS = {
+    'page_number', 'chunk_index', 'unit_number', 'unit_title',
+    'lesson_number', 'lesson_title', 'lesson_start_page', 'lesson_end_page',
+    'content_length', 'text_quality', 'content', 'source_file', 'content_category'
+}
+
+# 内容分类到content_type的映射
+CATEGORY_CONTENT_TYPES = {
+    '课文': '课文主体',
+    '习作': '习作指导',
+    '交流': '口语交际',
+    '练习': '课后练习',
+    '日积月累': '日积月累',
+    '阅读': '阅读材料',
+}
 
 
 def load_csv_data(csv_path: str) -> List[Dict[str, Any]]:
@@ -39,15 +66,15 @@ def load_csv_data(csv_path: str) -> List[Dict[str, Any]]:
     print_status(f"加载CSV文件: {csv_path}", "📚")
 
     try:
-        # 读取CSV文件
-        df = pd.read_csv(csv_path)
+        # 读取CSV文件（只解析导入时用到的列）
+        df = pd.read_csv(csv_path, usecols=lambda col: col in CSV_COLUMNS)
 
         # 过滤高质量内容
         df = df[df['text_quality'].str.contains("'is_suitable': True", na=False)]
 
-        # 转换为字典列表
+        # 转换为字典列表（一次性按列导出记录，避免逐行构造Series）
         chunks = []
-        for _, row in df.iterrows():
+        for row in df.to_dict('records'):
             # 解析文本质量信息
             try:
                 text_quality = eval(row['text_quality']) if isinstance(row['text_quality'], str) else {}
@@ -77,20 +104,7 @@ def load_csv_data(csv_path: str) -> List[Dict[str, Any]]:
             if 'content_category' in row and pd.notna(row['content_category']):
                 metadata['content_category'] = row['content_category']
                 # 更新content_type以匹配分类
-                if row['content_category'] == '课文':
-                    metadata['content_type'] = '课文主体'
-                elif row['content_category'] == '习作':
-                    metadata['content_type'] = '习作指导'
-                elif row['content_category'] == '交流':
-                    metadata['content_type'] = '口语交际'
-                elif row['content_category'] == '练习':
-                    metadata['content_type'] = '课后练习'
-                elif row['content_category'] == '日积月累':
-                    metadata['content_type'] = '日积月累'
-                elif row['content_category'] == '阅读':
-                    metadata['content_type'] = '阅读材料'
-                else:
-                    metadata['content_type'] = '其他内容'
+                metadata['content_type'] = CATEGORY_CONTENT_TYPES.get(row['content_category'], '其他内容')
 
             chunk = {
                 'content': row['content'],
@@ -157,21 +171,31 @@ def import_chunks_to_database(chunks: List[Dict[str, Any]], llm = None):
             ).delete()
             session.commit()
 
-        imported_count = 0
-        skipped_count = 0
+        # 数据库中已有的内容（如其他来源导入的相同片段）无需再调用嵌入接口
+        chunk_hashes = [generate_content_hash(chunk_data['content']) for chunk_data in chunks]
+        existing_hashes = set()
+        if chunk_hashes:
+            existing_hashes = {
+                content_hash for (content_hash,) in session.query(TextbookChunk.content_hash).filter(
+                    TextbookChunk.content_hash.in_(set(chunk_hashes))
+                )
+            }
+
+        session.close()
 
-        for chunk_data in chunks:
-            # 检查内容是否已存在
-            content_hash = generate_content_hash(chunk_data['content'])
-            existing = session.query(TextbookChunk).filter(
-                TextbookChunk.content_hash == content_hash
-            ).first()
+        rows = []
+        seen_hashes = set(existing_hashes)
+        skipped_count = 0
+        imported_count = 0
 
-            if existing:
+        for chunk_data, content_hash in zip(chunks, chunk_hashes):
+            # 跳过本批次内及数据库中已有的重复内容
+            if content_hash in seen_hashes:
                 skipped_count += 1
                 continue
+            seen_hashes.add(content_hash)
 
-            # 生成嵌入向量
+            # 生成嵌入向量，维度与embedding列不符的向量无法写入，按缺失处理
             embedding = None
             if llm:
                 try:
@@ -180,29 +204,33 @@ def import_chunks_to_database(chunks: List[Dict[str, Any]], llm = None):
                     print_status(f"生成嵌入向量失败: {e}", "⚠️")
                     embedding = None
 
-            # 创建数据库记录
-            db_chunk = TextbookChunk(
-                content=chunk_data['content'],
-                embedding=embedding,
-                content_hash=content_hash,
-                metadata_json=chunk_data['metadata_json'],
-                source_file=chunk_data['source_file'],
-                chunk_index=chunk_data['chunk_index'],
-                page_number=chunk_data['page_number'],
-                quality_score=chunk_data['quality_score']
-            )
-
-            session.add(db_chunk)
-            imported_count += 1
-
-            # 每10个片段提交一次
-            if imported_count % 10 == 0:
-                session.commit()
-                print_status(f"已导入 {imported_count} 个片段", "💾")
-
-        # 最终提交
-        session.commit()
-        session.close()
+                if embedding is not None and len(embedding) != EMBEDDING_DIMENSION:
+                    print_status(f"嵌入向量维度为 {len(embedding)}，应为 {EMBEDDING_DIMENSION}，不保存向量", "⚠️")
+                    embedding = None
+
+            rows.append({
+                'content': chunk_data['content'],
+                'embedding': embedding,
+                'content_hash': content_hash,
+                'metadata_json': chunk_data['metadata_json'],
+                'source_file': chunk_data['source_file'],
+                'chunk_index': chunk_data['chunk_index'],
+                'page_number': chunk_data['page_number'],
+                'quality_score': chunk_data['quality_score']
+            })
+
+            # 分批写入，后续失败时已生成的向量不会全部丢失
+            if len(rows) >= IMPORT_BATCH_SIZE:
+                inserted = bulk_insert_chunks(rows)
+                imported_count += inserted
+                skipped_count += len(rows) - inserted
+                print_status(f"已写入 {imported_count} 个片段", "💾")
+                rows = []
+
+        # 写入剩余片段，数据库中已存在的内容按content_hash跳过
+        inserted = bulk_insert_chunks(rows)
+        imported_count += inserted
+        skipped_count += len(rows) - inserted
 
         print_status(f"成功导入 {imported_count} 个片段，跳过 {skipped_count} 个重复片段", "✅")
         return True
@@ -28,10 +28,13 @@ from homeworkpal.llm.siliconflow import create_siliconflow_client
 from homeworkpal.document import create_pdf_processor, create_pdf_splitter
 from sqlalchemy.orm import sessionmaker
 
+# 状态图标
+_STATUS_ICONS = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾"}
+
+
 def print_status(message: str, status: str):
     """打印状态信息"""
-    icons = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾"}
-    print(f"{icons.get(status, 'ℹ️')} {message}")
+    print(f"{_STATUS_ICONS.get(status, 'ℹ️')} {message}")
 
 
 def process_textbook_documents(data_dir: str) -> List[Dict[str, Any]]:
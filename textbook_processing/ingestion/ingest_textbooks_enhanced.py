@@ -29,10 +29,13 @@ from homeworkpal.document import create_pdf_processor, create_pdf_splitter
 from homeworkpal.document.chinese_text_processor import ChineseTextProcessor
 from sqlalchemy.orm import sessionmaker
 
+# 状态图标
+_STATUS_ICONS = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾", "🚀": "🚀"}
+
+
 def print_status(message: str, status: str):
     """打印状态信息"""
-    icons = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾", "🚀": "🚀"}
-    print(f"{icons.get(status, 'ℹ️')} {message}")
+    print(f"{_STATUS_ICONS.get(status, 'ℹ️')} {message}")
 
 
 def process_textbook_documents_enhanced(data_dir: str) -> List[Dict[str, Any]]:
@@ -221,7 +224,7 @@ def generate_embeddings_enhanced(chunks: List[Dict[str, Any]],
         expected_dim = 1024  # BGE-M3的维度
         valid_count = 0
         for i, embedding in enumerate(embeddings):
-            if len(embedding) == expected_dim and embedding != [0.0] * expected_dim:
+            if len(embedding) == expected_dim and embedding.any():
                 valid_count += 1
 
         print(f"  📊 有效向量: {valid_count}/{len(embeddings)}")
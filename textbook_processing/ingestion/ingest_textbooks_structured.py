@@ -14,6 +14,8 @@ import hashlib
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
+import numpy as np
+
 # 添加项目根目录到Python路径
 project_root = Path(__file__).parent
 sys.path.insert(0, str(project_root))
@@ -30,10 +32,13 @@ from homeworkpal.document.chinese_text_processor import ChineseTextProcessor
 from homeworkpal.document.chinese_textbook_analyzer import ChineseTextbookAnalyzer, LessonInfo, TextbookStructure
 from sqlalchemy.orm import sessionmaker
 
+# 状态图标
+_STATUS_ICONS = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾", "🚀": "🚀", "📖": "📖", "🏗️": "🏗️"}
+
+
 def print_status(message: str, status: str):
     """打印状态信息"""
-    icons = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾", "🚀": "🚀", "📖": "📖", "🏗️": "🏗️"}
-    print(f"{icons.get(status, 'ℹ️')} {message}")
+    print(f"{_STATUS_ICONS.get(status, 'ℹ️')} {message}")
 
 
 def process_textbook_structured(data_dir: str) -> TextbookStructure:
@@ -233,7 +238,7 @@ def generate_structured_embeddings(structure: TextbookStructure, embedding_clien
             for chunk in lesson.content_chunks:
                 chunk_record = {
                     'content': chunk['content'],
-                    'embedding': [0.0] * 1024,  # 零向量占位
+                    'embedding': np.zeros(ChineseTextProcessor.EMBEDDING_DIMENSION, dtype=np.float32),  # 零向量占位
                     'content_hash': hashlib.md5(chunk['content'].encode('utf-8')).hexdigest(),
                     'metadata_json': {
                         **chunk['metadata'],
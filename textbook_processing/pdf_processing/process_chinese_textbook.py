@@ -24,10 +24,13 @@ from homeworkpal.database.connection import engine, SessionLocal
 from homeworkpal.database.models import TextbookChunk
 from sqlalchemy.orm import sessionmaker
 
+# 状态图标
+_STATUS_ICONS = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾"}
+
+
 def print_status(message: str, status: str):
     """打印状态信息"""
-    icons = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾"}
-    print(f"{icons.get(status, 'ℹ️')} {message}")
+    print(f"{_STATUS_ICONS.get(status, 'ℹ️')} {message}")
 
 
 def extract_text_from_pdf(pdf_path: str) -> List[Dict[str, Any]]:
@@ -34,10 +34,13 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# 状态图标
+_STATUS_ICONS = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾"}
+
+
 def print_status(message: str, status: str):
     """打印状态信息"""
-    icons = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾"}
-    print(f"{icons.get(status, 'ℹ️')} {message}")
+    print(f"{_STATUS_ICONS.get(status, 'ℹ️')} {message}")
 
 
 def process_chinese_textbook():
@@ -103,7 +106,7 @@ def process_chinese_textbook():
         print(f"✅ 向量化完成:")
         print(f"  - 处理时间: {processing_time:.1f}秒")
         print(f"  - 向量数量: {len(embeddings)}")
-        print(f"  - 向量维度: {len(embeddings[0]) if embeddings else 0}")
+        print(f"  - 向量维度: {embeddings.shape[1] if len(embeddings) else 0}")
 
         # 7. 保存到数据库
         print_status("保存到数据库", "💾")
@@ -143,7 +146,7 @@ def save_chunks_to_database(chunks, embeddings, pdf_result):
             # 创建数据库记录
             db_chunk = TextbookChunk(
                 content=chunk['content'],
-                embedding=embeddings[i] if i < len(embeddings) else [0.0] * 1024,
+                embedding=embeddings[i],
                 content_hash=content_hash,
                 metadata_json={
                     'pdf_file': pdf_result['file_name'],
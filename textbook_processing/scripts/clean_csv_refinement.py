@@ -17,10 +17,55 @@ from typing import Dict, List, Tuple, Optional
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+# 空白清理用正则（模块加载时预编译）
+_MULTI_SPACE_RE = re.compile(r' +')
+_MULTI_NEWLINE_RE = re.compile(r'\n+')
+_FULLWIDTH_SPACE_RE = re.compile(r'\u3000+')
+_NBSP_RE = re.compile(r'\u00A0+')
+_NEWLINE_SPACE_RE = re.compile(r'\n +')
+_SPACE_NEWLINE_RE = re.compile(r' +\n')
+
+# 从内容中提取课程标题的模式
+_TITLE_PATTERNS = [
+    re.compile(r'([^。\n]{2,8}?)\s*本文作者'),
+    re.compile(r'([^。\n]{2,8}?)\s*选作课文时有改动'),
+    re.compile(r'([^。\n]{2,10}?)\s*唐\s+\w+'),
+    re.compile(r'([^。\n]{2,10}?)\s*宋\s+\w+'),
+    re.compile(r'([^。\n]{2,10}?)\s*清\s+\w+'),
+]
+
+# 标题末尾多余的标点和空白
+_TITLE_TRAILING_PUNCT_RE = re.compile(r'[：:，,\s]+$')
+
+# 练习和指导类内容的关键词，合并为一个正则一次扫描
+_SKIP_LINE_KEYWORDS = [
+    '朗读课文', '背诵课文', '默写', '想一想', '说一说', '写一写',
+    '和同学交流', '小练笔', '习作', '口语交际', '资料袋',
+    '注释', '日积月累', '阅读链接', '书写提示', '语文园地',
+    '交流平台', '词句段运用', '识字表', '写字表', '词语表',
+    '练习', '选择', '下面的', '怎样', '如何', '说说',
+    '小组活动', '讨论', '展示', '猜猜', '游戏'
+]
+_SKIP_LINE_RE = re.compile('|'.join(map(re.escape, _SKIP_LINE_KEYWORDS)))
+
+# 内容类型的中文名称
+_CONTENT_TYPE_NAMES = {
+    'lesson_main': '课文主体',
+    'exercise': '练习活动',
+    'instruction': '教学指导',
+    'supplementary': '辅助材料',
+    'mixed': '混合内容',
+    'empty': '空白内容'
+}
+
+
+# 状态图标
+_STATUS_ICONS = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾", "📖": "📖", "🗑️": "🗑️"}
+
+
 def print_status(message: str, status: str):
     """打印状态信息"""
-    icons = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾", "📖": "📖", "🗑️": "🗑️"}
-    print(f"{icons.get(status, 'ℹ️')} {message}")
+    print(f"{_STATUS_ICONS.get(status, 'ℹ️')} {message}")
 
 
 def clean_whitespace(text: str) -> str:
@@ -32,23 +77,23 @@ def clean_whitespace(text: str) -> str:
     text = str(text).strip()
 
     # 将多个连续空格替换为单个空格
-    text = re.sub(r' +', ' ', text)
+    text = _MULTI_SPACE_RE.sub(' ', text)
 
     # 将多个连续换行符替换为单个换行符
-    text = re.sub(r'\n+', '\n', text)
+    text = _MULTI_NEWLINE_RE.sub('\n', text)
 
     # 移除行首行尾的换行符
     text = text.strip()
 
     # 处理特殊的空白字符（如全角空格）
-    text = re.sub(r'\u3000+', ' ', text)  # 全角空格
-    text = re.sub(r'\u00A0+', ' ', text)  # 不换行空格
+    text = _FULLWIDTH_SPACE_RE.sub(' ', text)  # 全角空格
+    text = _NBSP_RE.sub(' ', text)  # 不换行空格
 
     # 清理换行符后的多余空格
-    text = re.sub(r'\n +', '\n', text)
+    text = _NEWLINE_SPACE_RE.sub('\n', text)
 
     # 清理空格后的换行符
-    text = re.sub(r' +\n', '\n', text)
+    text = _SPACE_NEWLINE_RE.sub('\n', text)
 
     return text.strip()
 
@@ -121,14 +166,6 @@ def extract_lesson_main_content(content: str) -> str:
 
     lines = str(content).split('\n')
     lesson_lines = []
-    skip_patterns = [
-        r'朗读课文', r'背诵课文', r'默写', r'想一想', r'说一说', r'写一写',
-        r'和同学交流', r'小练笔', r'习作', r'口语交际', r'资料袋',
-        r'注释', r'日积月累', r'阅读链接', r'书写提示', r'语文园地',
-        r'交流平台', r'词句段运用', r'识字表', r'写字表', r'词语表',
-        r'练习', r'选择', r'下面的', r'怎样', r'如何', r'说说',
-        r'小组活动', r'讨论', r'展示', r'猜猜', r'游戏'
-    ]
 
     for line in lines:
         line = line.strip()
@@ -136,7 +173,7 @@ def extract_lesson_main_content(content: str) -> str:
             continue
 
         # 跳过明显的练习和指导内容
-        is_skip_line = any(re.search(pattern, line) for pattern in skip_patterns)
+        is_skip_line = _SKIP_LINE_RE.search(line) is not None
 
         # 保留课文主体内容
         if not is_skip_line:
@@ -147,7 +184,7 @@ def extract_lesson_main_content(content: str) -> str:
     return '\n'.join(lesson_lines)
 
 
-def fix_lesson_title(row: pd.Series) -> str:
+def fix_lesson_title(row: Dict) -> str:
     """修复课程标题"""
     current_title = str(row.get('lesson_title', '')).strip()
 
@@ -156,16 +193,8 @@ def fix_lesson_title(row: pd.Series) -> str:
         content = str(row.get('content', ''))
 
         # 尝试从内容中提取真实的课程标题
-        title_patterns = [
-            r'([^。\n]{2,8}?)\s*本文作者',
-            r'([^。\n]{2,8}?)\s*选作课文时有改动',
-            r'([^。\n]{2,10}?)\s*唐\s+\w+',
-            r'([^。\n]{2,10}?)\s*宋\s+\w+',
-            r'([^。\n]{2,10}?)\s*清\s+\w+',
-        ]
-
-        for pattern in title_patterns:
-            match = re.search(pattern, content)
+        for pattern in _TITLE_PATTERNS:
+            match = pattern.search(content)
             if match:
                 extracted_title = match.group(1).strip()
                 if len(extracted_title) >= 2 and len(extracted_title) <= 12:
@@ -174,7 +203,7 @@ def fix_lesson_title(row: pd.Series) -> str:
     # 清理现有标题
     if current_title:
         # 移除不必要的标点符号
-        current_title = re.sub(r'[：:，,\s]+$', '', current_title)
+        current_title = _TITLE_TRAILING_PUNCT_RE.sub('', current_title)
         current_title = current_title.strip()
 
         # 如果标题太短，可能是错误的
@@ -184,6 +213,11 @@ def fix_lesson_title(row: pd.Series) -> str:
     return current_title
 
 
+def _column_or_empty(df: pd.DataFrame, column: str) -> pd.Series:
+    """取出指定列，缺少该列时返回空字符串列（与逐行 row.get(column, '') 的行为一致）"""
+    return df.get(column, pd.Series('', index=df.index, dtype=object))
+
+
 def enhance_csv_data(df: pd.DataFrame) -> pd.DataFrame:
     """增强CSV数据，添加内容分类和清理后的内容"""
     enhanced_df = df.copy()
@@ -194,33 +228,33 @@ def enhance_csv_data(df: pd.DataFrame) -> pd.DataFrame:
     enhanced_df['lesson_main_content'] = ''
     enhanced_df['fixed_lesson_title'] = ''
 
-    print_status("开始处理CSV数据行", "🔧")
+    print_status(f"开始处理CSV数据行: 共 {len(enhanced_df)} 条", "🔧")
 
-    for idx, row in enhanced_df.iterrows():
-        if idx % 20 == 0:
-            print_status(f"处理进度: {idx+1}/{len(enhanced_df)}", "📊")
+    # 获取原始数据（按列处理，避免逐行构造Series）
+    contents = _column_or_empty(enhanced_df, 'content').astype(str)
+    raw_lesson_titles = _column_or_empty(enhanced_df, 'lesson_title')
+    lesson_titles = raw_lesson_titles.astype(str)
+    unit_titles = _column_or_empty(enhanced_df, 'unit_title').astype(str)
 
-        # 获取原始数据
-        content = str(row.get('content', ''))
-        lesson_title = str(row.get('lesson_title', ''))
-        unit_title = str(row.get('unit_title', ''))
-
-        # 1. 清理空白
-        cleaned_content = clean_whitespace(content)
-        enhanced_df.at[idx, 'cleaned_content'] = cleaned_content
+    # 1. 清理空白
+    cleaned_content = contents.map(clean_whitespace)
+    enhanced_df['cleaned_content'] = cleaned_content
 
-        # 2. 分类内容
-        content_type = classify_content_type(cleaned_content, lesson_title, unit_title)
-        enhanced_df.at[idx, 'content_type'] = content_type
+    # 2. 分类内容
+    enhanced_df['content_type'] = [
+        classify_content_type(content, lesson_title, unit_title)
+        for content, lesson_title, unit_title in zip(cleaned_content, lesson_titles, unit_titles)
+    ]
 
-        # 3. 提取课文主体内容
-        if content_type in ['lesson_main', 'mixed']:
-            lesson_main = extract_lesson_main_content(cleaned_content)
-            enhanced_df.at[idx, 'lesson_main_content'] = lesson_main
+    # 3. 提取课文主体内容
+    main_mask = enhanced_df['content_type'].isin(['lesson_main', 'mixed'])
+    enhanced_df.loc[main_mask, 'lesson_main_content'] = cleaned_content[main_mask].map(extract_lesson_main_content)
 
-        # 4. 修复课程标题
-        fixed_title = fix_lesson_title(row)
-        enhanced_df.at[idx, 'fixed_lesson_title'] = fixed_title
+    # 4. 修复课程标题
+    enhanced_df['fixed_lesson_title'] = [
+        fix_lesson_title({'lesson_title': lesson_title, 'content': content})
+        for lesson_title, content in zip(raw_lesson_titles, _column_or_empty(df, 'content'))
+    ]
 
     return enhanced_df
 
@@ -236,20 +270,18 @@ def generate_summary_report(enhanced_df: pd.DataFrame) -> Dict:
     }
 
     # 统计修复的标题数量
-    original_titles = enhanced_df['lesson_title'].fillna('')
+    original_titles = _column_or_empty(enhanced_df, 'lesson_title').fillna('')
     fixed_titles = enhanced_df['fixed_lesson_title'].fillna('')
-    report['title_fixes'] = sum(1 for orig, fixed in zip(original_titles, fixed_titles)
-                               if orig != fixed and fixed != '')
+    report['title_fixes'] = int(((original_titles != fixed_titles) & (fixed_titles != '')).sum())
 
     # 统计清理的内容数量
-    original_content = enhanced_df['content'].fillna('')
+    original_content = _column_or_empty(enhanced_df, 'content').fillna('')
     cleaned_content = enhanced_df['cleaned_content'].fillna('')
-    report['content_cleaned'] = sum(1 for orig, clean in zip(original_content, cleaned_content)
-                                   if orig != clean)
+    report['content_cleaned'] = int((original_content != cleaned_content).sum())
 
     # 统计提取的课文主体内容数量
     lesson_main_content = enhanced_df['lesson_main_content'].fillna('')
-    report['lesson_main_extracted'] = sum(1 for content in lesson_main_content if content != '')
+    report['lesson_main_extracted'] = int((lesson_main_content != '').sum())
 
     return report
 
@@ -293,14 +325,7 @@ def main():
 
         print("\n📋 内容类型分布:")
         for content_type, count in report['content_types'].items():
-            type_name = {
-                'lesson_main': '课文主体',
-                'exercise': '练习活动',
-                'instruction': '教学指导',
-                'supplementary': '辅助材料',
-                'mixed': '混合内容',
-                'empty': '空白内容'
-            }.get(content_type, content_type)
+            type_name = _CONTENT_TYPE_NAMES.get(content_type, content_type)
             print(f"   {type_name}: {count}")
 
         print(f"\n📄 输出文件: {output_csv}")
@@ -17,10 +17,25 @@ from typing import Dict, List, Optional
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
+# 空白清理用正则（模块加载时预编译）
+_MULTI_SPACE_RE = re.compile(r' +')
+_MULTI_NEWLINE_RE = re.compile(r'\n+')
+_FULLWIDTH_SPACE_RE = re.compile(r'\u3000+')
+_NBSP_RE = re.compile(r'\u00A0+')
+_NEWLINE_SPACE_RE = re.compile(r'\n +')
+_SPACE_NEWLINE_RE = re.compile(r' +\n')
+
+# 分块读写CSV时每块的记录数
+CSV_CHUNK_SIZE = 5000
+
+
+# 状态图标
+_STATUS_ICONS = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾", "📖": "📖"}
+
+
 def print_status(message: str, status: str):
     """打印状态信息"""
-    icons = {"✅": "✅", "❌": "❌", "⚠️": "⚠️", "🔧": "🔧", "📚": "📚", "🔍": "🔍", "💾": "💾", "📖": "📖"}
-    print(f"{icons.get(status, 'ℹ️')} {message}")
+    print(f"{_STATUS_ICONS.get(status, 'ℹ️')} {message}")
 
 
 def clean_content_text(text: str) -> str:
@@ -32,20 +47,20 @@ def clean_content_text(text: str) -> str:
     text = str(text)
 
     # 将多个连续空格替换为单个空格
-    text = re.sub(r' +', ' ', text)
+    text = _MULTI_SPACE_RE.sub(' ', text)
 
     # 将多个连续换行符替换为单个换行符
-    text = re.sub(r'\n+', '\n', text)
+    text = _MULTI_NEWLINE_RE.sub('\n', text)
 
     # 处理特殊的空白字符（如全角空格）
-    text = re.sub(r'\u3000+', ' ', text)  # 全角空格
-    text = re.sub(r'\u00A0+', ' ', text)  # 不换行空格
+    text = _FULLWIDTH_SPACE_RE.sub(' ', text)  # 全角空格
+    text = _NBSP_RE.sub(' ', text)  # 不换行空格
 
     # 清理换行符后的多余空格
-    text = re.sub(r'\n +', '\n', text)
+    text = _NEWLINE_SPACE_RE.sub('\n', text)
 
     # 清理空格后的换行符
-    text = re.sub(r' +\n', '\n', text)
+    text = _SPACE_NEWLINE_RE.sub('\n', text)
 
     # 移除行首行尾空白
     text = text.strip()
@@ -128,36 +143,56 @@ def classify_content_simple(content: str, lesson_title: str, unit_title: str) ->
             return '其他'
 
 
-def clean_and_classify_csv(input_path: Path, output_path: Path) -> pd.DataFrame:
-    """清理和分类CSV文件"""
-    # 读取原始CSV
-    print_status(f"读取CSV文件: {input_path}", "📖")
-    df = pd.read_csv(input_path)
-    print_status(f"原始CSV包含 {len(df)} 条记录", "📊")
+def clean_and_classify_chunk(df: pd.DataFrame) -> pd.DataFrame:
+    """清理和分类一批CSV记录"""
+    # 1. 清理内容（整列处理后一次性写回）
+    df['content'] = df['content'].map(clean_content_text)
+
+    # 2. 分类内容
+    df['content_category'] = [
+        classify_content_simple(content, lesson_title, unit_title)
+        for content, lesson_title, unit_title in zip(df['content'], df['lesson_title'], df['unit_title'])
+    ]
+
+    return df
 
-    # 添加分类列
-    df['content_category'] = ''
 
+def clean_and_classify_csv(input_path: Path, output_path: Path, chunk_size: int = CSV_CHUNK_SIZE) -> Dict:
+    """
+    分块清理和分类CSV文件
+
+    每次只读入chunk_size条记录，处理后立即追加写入输出文件，
+    内存占用与单个分块大小相关，而不是整个文件。
+
+    Returns:
+        合并后的处理摘要
+    """
+    print_status(f"读取CSV文件: {input_path}", "📖")
     print_status("开始清理和分类内容", "🔧")
 
-    for idx, row in df.iterrows():
-        if idx % 20 == 0:
-            print_status(f"处理进度: {idx+1}/{len(df)}", "📊")
+    summary = {'total_records': 0, 'categories': {}, 'cleaned_records': 0}
+    chunk_count = 0
 
-        # 获取原始内容
-        content = row.get('content', '')
-        lesson_title = row.get('lesson_title', '')
-        unit_title = row.get('unit_title', '')
+    for chunk in pd.read_csv(input_path, chunksize=chunk_size):
+        cleaned_chunk = clean_and_classify_chunk(chunk)
+        cleaned_chunk.to_csv(output_path, mode='w' if chunk_count == 0 else 'a', header=chunk_count == 0,
+                             index=False, encoding='utf-8')
+        chunk_count += 1
 
-        # 1. 清理内容
-        cleaned_content = clean_content_text(content)
-        df.at[idx, 'content'] = cleaned_content
+        # 合并分块摘要
+        chunk_summary = generate_summary(cleaned_chunk)
+        summary['total_records'] += chunk_summary['total_records']
+        summary['cleaned_records'] += chunk_summary['cleaned_records']
+        for category, count in chunk_summary['categories'].items():
+            summary['categories'][category] = summary['categories'].get(category, 0) + count
 
-        # 2. 分类内容
-        category = classify_content_simple(cleaned_content, lesson_title, unit_title)
-        df.at[idx, 'content_category'] = category
+    # 只有表头的CSV不会产生任何分块，仍然输出只有表头的清理结果
+    if chunk_count == 0:
+        clean_and_classify_chunk(pd.read_csv(input_path, nrows=0)).to_csv(output_path, index=False, encoding='utf-8')
 
-    return df
+    summary['categories'] = dict(sorted(summary['categories'].items(), key=lambda item: item[1], reverse=True))
+    print_status(f"原始CSV包含 {summary['total_records']} 条记录", "📊")
+    return summary
 
 
 def generate_summary(df: pd.DataFrame) -> Dict:
@@ -169,11 +204,9 @@ def generate_summary(df: pd.DataFrame) -> Dict:
     }
 
     # 统计清理的记录数（通过与原始记录比较长度变化）
-    for idx, row in df.iterrows():
-        original_length = len(str(row.get('content', '')))
-        # 假设原始内容有空白，清理后长度会不同
-        if original_length > 10:  # 只统计有意义的内容
-            summary['cleaned_records'] += 1
+    # 假设原始内容有空白，清理后长度会不同；只统计有意义的内容
+    content_lengths = df['content'].astype(str).str.len()
+    summary['cleaned_records'] = int((content_lengths > 10).sum())
 
     return summary
 
@@ -192,15 +225,9 @@ def main():
         return 1
 
     try:
-        # 处理CSV文件
-        cleaned_df = clean_and_classify_csv(input_csv, output_csv)
-
-        # 生成摘要报告
-        summary = generate_summary(cleaned_df)
-
-        # 保存清理后的CSV
+        # 处理CSV文件（分块写入清理后的CSV并生成摘要）
+        summary = clean_and_classify_csv(input_csv, output_csv)
         print_status(f"保存清理后的CSV文件: {output_csv}", "💾")
-        cleaned_df.to_csv(output_csv, index=False, encoding='utf-8')
 
         # 显示结果
         print("\n" + "=" * 50)